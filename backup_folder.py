@@ -12,43 +12,206 @@
 """
 
 import argparse
+import atexit
+import functools
 import json
 import logging
+import logging.handlers
+import math
 import os
 import sys
+import threading
 import time
 import random
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple, Set
+from typing import Dict, Iterator, List, Optional, Tuple, Set
 
+import httplib2
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 from google.oauth2.credentials import Credentials
+from google_auth_httplib2 import AuthorizedHttp
 from google_auth_oauthlib.flow import InstalledAppFlow
 
-# ログ設定
+# ログ設定（ファイルは初回書き込みまで開かず、肥大化したらローテーション）
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s %(levelname)s %(message)s',
     handlers=[
-        logging.FileHandler('backup_folder.log', encoding='utf-8'),
+        logging.handlers.RotatingFileHandler(
+            'backup_folder.log', maxBytes=10 * 1024 * 1024, backupCount=3,
+            encoding='utf-8', delay=True),
         logging.StreamHandler(sys.stdout)
     ]
 )
 logger = logging.getLogger(__name__)
 
+# アイテム単位の詳細ログを出すか（--verboseで有効化）
+verbose = False
+
+# 頻出MIMEタイプはintern済み定数にしておき、比較をポインタ一致で済ませる
+MIME_FOLDER = sys.intern('application/vnd.google-apps.folder')
+MIME_SHORTCUT = sys.intern('application/vnd.google-apps.shortcut')
+
+# Drive APIのバッチリクエストで1回に送るリクエスト数の上限（API上限は100）
+BATCH_SIZE = 100
+
+# files.listの複合クエリに含める「'id' in parents」句の数の上限
+MULTI_PARENT_CHUNK = 50
+
+# ファイルコピーの並列実行ワーカー数（--max-workersで変更可能）
+max_workers = 8
+
+# 並列コピー用のスレッドローカルservice管理
+_thread_local = threading.local()
+_credentials = None
+
+# httplib2のディスクキャッシュ置き場（ETag付きGETの304再検証用）
+HTTP_CACHE_DIR = '.drive_http_cache'
+
+def build_drive_service(creds):
+    """ディスクキャッシュ付きHTTPクライアントでDrive APIサービスを構築
+
+    files.get等のメタデータGETはETag付きで返るため、ディスクキャッシュを
+    有効にしておくと同じfileIdへの再取得（--resume時の再検証など）は
+    If-None-Match -> 304で済み、本文の再転送が発生しない。
+
+    httplib2はホストごとにkeep-alive接続を保持するため、1スレッド内の
+    連続リクエストはTCP+TLSハンドシェイクを繰り返さない。HTTP/2での
+    多重化はgoogleapiclientのトランスポートが対応しておらず、接続は
+    スレッドローカルなサービスごとに1本ずつ使い回す構成にしている。
+    """
+    http = AuthorizedHttp(creds, http=httplib2.Http(cache=HTTP_CACHE_DIR))
+    return build('drive', 'v3', http=http, cache_discovery=False)
+
+def get_thread_service(default_service):
+    """ワーカースレッド専用のDrive APIサービスを取得
+
+    googleapiclientのserviceオブジェクトはスレッドセーフではないため、
+    スレッドごとに別のserviceを構築する。認証情報が未設定の場合
+    （テスト等）は渡されたserviceをそのまま使う。
+    """
+    if _credentials is None:
+        return default_service
+    service = getattr(_thread_local, 'service', None)
+    if service is None:
+        service = build_drive_service(_credentials)
+        _thread_local.service = service
+    return service
+
+class DriveRateLimiter:
+    """Drive APIの429発生率に応じて送信レートを調整するトークンバケット
+
+    429/レート制限403を受けるとレートを半減(乗算減少)し、成功が続くと
+    少しずつ元のレートまで回復させる(加算増加)。バックオフだけの
+    リアクティブな制御と違い、失敗リクエスト自体を減らせる。
+    """
+
+    def __init__(self, rate: float = 8.0, capacity: float = 16.0):
+        self.rate = rate          # 現在の補充レート (リクエスト/秒)
+        self.max_rate = rate      # 回復上限
+        self.capacity = capacity  # バケット容量（バースト許容量）
+        self.tokens = capacity
+        self.alpha = 0.25         # 成功時の加算回復量
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0):
+        """トークンを取得（足りなければ補充されるまで待機）
+
+        Driveのクォータはバッチ内のサブリクエストも1件ずつ数えるため、
+        バッチ送信時はサブリクエスト数分の重みを渡す。容量を超える要求は
+        バケットを負に振らせて「借金」とし、後続の取得を遅らせることで
+        平均レートを守る。
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                needed = min(tokens, self.capacity)
+                if self.tokens >= needed:
+                    self.tokens -= tokens
+                    return
+                wait = (needed - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def on_throttle(self):
+        """レート制限エラーを受けたのでレートを半減"""
+        with self._lock:
+            self.rate = max(0.5, self.rate * 0.5)
+            logger.info(f"レート制限検出: 送信レートを{self.rate:.1f}リクエスト/秒に引き下げ")
+
+    def on_success(self):
+        """成功したのでレートを少しずつ回復"""
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.alpha)
+
+# 全スレッドで共有するレートリミッター（Driveのユーザあたり上限に合わせて8 QPS開始）
+rate_limiter = DriveRateLimiter()
+
+# リトライ対象のHTTPステータスコード（403はレート制限の場合のみリトライ）
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+# バックオフ時の最大待機秒数
+BACKOFF_CAP = 64.0
+
+def _is_retryable_error(error: HttpError) -> bool:
+    """HttpErrorがリトライで回復し得るエラーかを判定"""
+    status = getattr(error.resp, 'status', None)
+    if status in RETRYABLE_STATUS:
+        return True
+    if status == 403:
+        # 403はレート制限(rateLimitExceeded等)の場合のみリトライ対象
+        try:
+            reason = error._get_reason() or ''
+        except Exception:
+            reason = ''
+        return 'ratelimitexceeded' in reason.lower()
+    return False
+
+def _get_retry_after(error: HttpError) -> Optional[float]:
+    """レスポンスヘッダのRetry-After秒数を取得（なければNone）"""
+    try:
+        retry_after = error.resp.get('retry-after')
+        if retry_after is not None:
+            return float(retry_after)
+    except Exception:
+        pass
+    return None
+
 def retry_on_api_error(func, max_retries: int = 20, base_delay: float = 1.0):
     """APIエラー時のリトライ機能"""
     for attempt in range(max_retries + 1):
         try:
-            return func()
+            rate_limiter.acquire()
+            result = func()
+            rate_limiter.on_success()
+            return result
         except HttpError as error:
+            retryable = _is_retryable_error(error)
+            status = getattr(error.resp, 'status', None)
+            # レート制限によるエラーの場合のみ送信レートを引き下げる
+            # （権限エラー等の403でレートを落とさないよう、先に分類する）
+            if status == 429 or (status == 403 and retryable):
+                rate_limiter.on_throttle()
+            # 404/401等の回復不能なエラーはリトライせず即座に再発生
+            if not retryable:
+                logger.error(f"リトライ対象外のAPIエラー: {error}")
+                raise
             if attempt == max_retries:
                 logger.error(f"最大リトライ回数({max_retries})に達しました: {error}")
                 raise
-            
-            # 指数バックオフ + ジッター（ランダム要素）
-            delay = base_delay * (2 ** attempt) + random.uniform(0, 1)
+
+            # フルジッター方式の指数バックオフ（リトライ同士の同期を避ける）
+            delay = random.uniform(0, min(BACKOFF_CAP, base_delay * (2 ** attempt)))
+            # サーバ指定のRetry-Afterがあれば尊重する
+            retry_after = _get_retry_after(error)
+            if retry_after is not None:
+                delay = max(delay, retry_after)
             logger.warning(f"APIエラー (試行 {attempt + 1}/{max_retries + 1}): {error}")
             logger.info(f"{delay:.1f}秒後にリトライします...")
             time.sleep(delay)
@@ -59,23 +222,33 @@ def retry_on_api_error(func, max_retries: int = 20, base_delay: float = 1.0):
 
 class CheckpointManager:
     """チェックポイント管理クラス"""
-    
+
     def __init__(self, checkpoint_file: str = 'backup_checkpoint.json'):
         self.checkpoint_file = checkpoint_file
+        # 処理済みフォルダはJSONに入れず、追記専用ログに1行1件で記録する
+        # （追加のたびにJSON全体を書き直すとO(N^2)バイトの書き込みになるため）
+        self.log_file = os.path.splitext(checkpoint_file)[0] + '.log'
+        self._log = None
         self.processed_folders: Set[str] = set()
         self.backup_folder_id: Optional[str] = None
         self.source_folder_id: Optional[str] = None
         self.target_folder_id: Optional[str] = None
         self.backup_folder_name: Optional[str] = None
         self.start_time: Optional[datetime] = None
-        
+        # 並列コピー時にワーカースレッドから更新されるためロックで保護
+        self._lock = threading.Lock()
+
     def load_checkpoint(self) -> bool:
         """チェックポイントを読み込み"""
         try:
             if os.path.exists(self.checkpoint_file):
                 with open(self.checkpoint_file, 'r', encoding='utf-8') as f:
                     data = json.load(f)
+                    # 旧形式のチェックポイント（JSON内のリスト）も読めるようにしておく
                     self.processed_folders = set(data.get('processed_folders', []))
+                    if os.path.exists(self.log_file):
+                        with open(self.log_file, 'r', encoding='utf-8') as log:
+                            self.processed_folders.update(log.read().splitlines())
                     self.backup_folder_id = data.get('backup_folder_id')
                     self.source_folder_id = data.get('source_folder_id')
                     self.target_folder_id = data.get('target_folder_id')
@@ -94,7 +267,6 @@ class CheckpointManager:
         """チェックポイントを保存"""
         try:
             data = {
-                'processed_folders': list(self.processed_folders),
                 'backup_folder_id': self.backup_folder_id,
                 'source_folder_id': self.source_folder_id,
                 'target_folder_id': self.target_folder_id,
@@ -102,23 +274,49 @@ class CheckpointManager:
                 'start_time': self.start_time.isoformat() if self.start_time else None,
                 'last_updated': datetime.now().isoformat()
             }
-            with open(self.checkpoint_file, 'w', encoding='utf-8') as f:
+            # 一時ファイルに書いてからrenameすることで中断時の破損を防ぐ
+            tmp_file = self.checkpoint_file + '.tmp'
+            with open(tmp_file, 'w', encoding='utf-8') as f:
                 json.dump(data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_file, self.checkpoint_file)
         except Exception as e:
             logger.error(f"チェックポイントの保存に失敗: {e}")
-    
-    def add_processed_folder(self, folder_name: str):
-        """処理済みフォルダを追加"""
-        self.processed_folders.add(folder_name)
-        self.save_checkpoint()
-    
-    def is_processed(self, folder_name: str) -> bool:
-        """フォルダが処理済みかチェック"""
-        return folder_name in self.processed_folders
+
+    def add_processed_folder(self, folder_id: str):
+        """処理済みフォルダをコピー元IDで追加（追記専用ログにO(1)で記録）
+
+        フォルダ名は兄弟間で重複したり改名されたりするため、
+        キーには安定したコピー元フォルダIDを使う。
+        """
+        with self._lock:
+            self.processed_folders.add(folder_id)
+            try:
+                if self._log is None:
+                    # 行バッファリングで開き、1件ごとに1行追記するだけにする
+                    self._log = open(self.log_file, 'a', encoding='utf-8', buffering=1)
+                self._log.write(folder_id + '\n')
+            except Exception as e:
+                logger.error(f"チェックポイントログの書き込みに失敗: {e}")
+
+    def flush(self):
+        """追記ログを閉じてディスクへ確実に書き出す"""
+        with self._lock:
+            if self._log is not None:
+                self._log.close()
+                self._log = None
+
+    def is_processed(self, folder_id: str) -> bool:
+        """フォルダがコピー元IDで処理済みかチェック"""
+        return folder_id in self.processed_folders
     
     def clear_checkpoint(self):
         """チェックポイントをクリア"""
         try:
+            if self._log is not None:
+                self._log.close()
+                self._log = None
+            if os.path.exists(self.log_file):
+                os.remove(self.log_file)
             if os.path.exists(self.checkpoint_file):
                 os.remove(self.checkpoint_file)
                 logger.info("チェックポイントをクリアしました")
@@ -127,14 +325,21 @@ class CheckpointManager:
 
 class ProgressTracker:
     """進捗状況を追跡するクラス"""
-    
+
+    # 進捗ログの最短間隔（秒）。毎アイテムのETA計算とログ出力は
+    # 大規模コピーではそれ自体がボトルネックになる
+    LOG_INTERVAL_SEC = 1.0
+
     def __init__(self):
         self.total_items = 0
         self.processed_items = 0
         self.start_time = None
         self.folder_count = 0
         self.file_count = 0
-        
+        # 並列コピー時にワーカースレッドから更新されるためロックで保護
+        self._lock = threading.Lock()
+        self._last_log = 0.0
+
     def start(self, total_items: int):
         """進捗追跡を開始"""
         self.total_items = total_items
@@ -147,14 +352,23 @@ class ProgressTracker:
         
     def update(self, item_type: str = "item"):
         """進捗を更新"""
-        self.processed_items += 1
-        if item_type == "folder":
-            self.folder_count += 1
-        elif item_type == "file":
-            self.file_count += 1
-            
+        with self._lock:
+            self.processed_items += 1
+            if item_type == "folder":
+                self.folder_count += 1
+            elif item_type == "file":
+                self.file_count += 1
+
+        # ETA計算とログ出力は最短でもLOG_INTERVAL_SECに1回に抑える
+        # （完了時と詳細モードは常に出す）
+        now = time.time()
+        if not verbose and self.processed_items != self.total_items:
+            if now - self._last_log < self.LOG_INTERVAL_SEC:
+                return
+        self._last_log = now
+
         if self.start_time:
-            elapsed_time = time.time() - self.start_time
+            elapsed_time = now - self.start_time
             if self.processed_items > 0:
                 items_per_sec = self.processed_items / elapsed_time
                 remaining_items = self.total_items - self.processed_items
@@ -185,9 +399,13 @@ class ProgressTracker:
 progress_tracker = ProgressTracker()
 checkpoint_manager = CheckpointManager()
 
+# 正常終了時に未保存のチェックポイントを必ず書き出す
+atexit.register(checkpoint_manager.flush)
+
 # 認証情報の読み込み
+@functools.lru_cache(maxsize=1)
 def load_secrets():
-    """my_secrets.jsonから認証情報を読み込む"""
+    """my_secrets.jsonから認証情報を読み込む（結果はプロセス内でキャッシュ）"""
     try:
         with open('my_secrets.json', encoding='utf-8') as f:
             secrets = json.load(f)
@@ -202,8 +420,9 @@ def load_secrets():
         logger.error(f"my_secrets.jsonのJSON形式が不正です: {e}")
         sys.exit(1)
 
+@functools.lru_cache(maxsize=1)
 def load_settings():
-    """my_settings.jsonから設定を読み込む"""
+    """my_settings.jsonから設定を読み込む（結果はプロセス内でキャッシュ）"""
     try:
         with open('my_settings.json', encoding='utf-8') as f:
             settings = json.load(f)
@@ -236,164 +455,450 @@ def get_credentials():
     
     return creds
 
-def list_drive_files(service, folder_id: str, skip_shortcuts: bool = False) -> List[Dict]:
-    """フォルダ内の全ファイル・フォルダを取得"""
-    files = []
+def iter_drive_files(service, folder_id: str, skip_shortcuts: bool = False,
+                     fields_extra: Optional[str] = None) -> Iterator[Dict]:
+    """フォルダ内の全ファイル・フォルダを1件ずつyieldするジェネレータ
+
+    ページ取得のたびに全件をリストへ溜め込まず、ページ単位のメモリ消費で
+    ストリーム処理できる。fields_extraに追加のフィールド（'size'等）を
+    指定できる。デフォルトではコピー・表示に必要な最小限
+    （id, name, mimeType）だけを要求する。
+    """
     page_token = None
-    
+    file_fields = 'id, name, mimeType'
+    if fields_extra:
+        file_fields += f', {fields_extra}'
+
     while True:
         def api_call():
             response = service.files().list(
                 q=f"'{folder_id}' in parents",
                 spaces='drive',
-                fields='nextPageToken, files(id, name, mimeType, size, parents)',
+                fields=f'nextPageToken, files({file_fields})',
                 includeItemsFromAllDrives=True,
                 supportsAllDrives=True,
+                pageSize=1000,
                 pageToken=page_token
             ).execute()
             return response
-        
+
         try:
             response = retry_on_api_error(api_call)
-            
+        except Exception as error:
+            logger.error(f"ファイル一覧取得エラー: {error}")
+            return
+
+        for item in response.get('files', []):
+            # 以降の比較がポインタ一致で済むよう取り込み時にinternしておく
+            item['mimeType'] = sys.intern(item['mimeType'])
             # ショートカットをスキップする場合
-            if skip_shortcuts:
-                filtered_files = [f for f in response.get('files', []) 
-                                if f['mimeType'] != 'application/vnd.google-apps.shortcut']
-                files.extend(filtered_files)
-            else:
-                files.extend(response.get('files', []))
-            
+            if skip_shortcuts and item['mimeType'] == MIME_SHORTCUT:
+                continue
+            yield item
+
+        page_token = response.get('nextPageToken', None)
+
+        if not page_token:
+            return
+
+def list_drive_files(service, folder_id: str, skip_shortcuts: bool = False,
+                     fields_extra: Optional[str] = None) -> List[Dict]:
+    """フォルダ内の全ファイル・フォルダをリストで取得
+
+    走査キャッシュのようにリストが必要な呼び出し元向けの薄いラッパー。
+    逐次処理で十分な場合はiter_drive_filesを直接使う。
+    """
+    return list(iter_drive_files(service, folder_id, skip_shortcuts, fields_extra))
+
+def list_drive_files_multi(service, folder_ids: List[str], skip_shortcuts: bool = False,
+                           fields_extra: Optional[str] = None) -> Dict[str, List[Dict]]:
+    """複数フォルダの子アイテムを複合クエリでまとめて取得
+
+    「'id' in parents」句をorで連結してMULTI_PARENT_CHUNKフォルダ分を
+    1回のfiles.listに相乗りさせ、レスポンスのparentsで親ごとに振り分ける。
+    """
+    children: Dict[str, List[Dict]] = {fid: [] for fid in folder_ids}
+
+    # 親ごとの振り分けにparentsが必須
+    file_fields = 'id, name, mimeType, parents'
+    if fields_extra:
+        file_fields += f', {fields_extra}'
+
+    for start in range(0, len(folder_ids), MULTI_PARENT_CHUNK):
+        chunk = folder_ids[start:start + MULTI_PARENT_CHUNK]
+
+        # 1フォルダだけなら従来の単独クエリで十分
+        if len(chunk) == 1:
+            children[chunk[0]] = list_drive_files(service, chunk[0], skip_shortcuts, fields_extra)
+            continue
+
+        query = " or ".join(f"'{fid}' in parents" for fid in chunk)
+        page_token = None
+
+        while True:
+            def api_call():
+                response = service.files().list(
+                    q=query,
+                    spaces='drive',
+                    fields=f'nextPageToken, files({file_fields})',
+                    includeItemsFromAllDrives=True,
+                    supportsAllDrives=True,
+                    pageSize=1000,
+                    pageToken=page_token
+                ).execute()
+                return response
+
+            try:
+                response = retry_on_api_error(api_call)
+            except Exception as error:
+                logger.error(f"ファイル一覧取得エラー: {error}")
+                break
+
+            for item in response.get('files', []):
+                item['mimeType'] = sys.intern(item['mimeType'])
+                if skip_shortcuts and item['mimeType'] == MIME_SHORTCUT:
+                    continue
+                for parent_id in item.get('parents', []):
+                    if parent_id in children:
+                        children[parent_id].append(item)
+
             page_token = response.get('nextPageToken', None)
-            
             if not page_token:
                 break
-                
-        except Exception as error:
-            logger.error(f"ファイル一覧取得エラー: {error}")
-            break
-    
-    return files
 
-def count_total_items_recursive(service, folder_id: str, skip_shortcuts: bool = False) -> int:
-    """フォルダ内の総アイテム数を再帰的にカウント"""
-    total = 0
-    items = list_drive_files(service, folder_id, skip_shortcuts)
-    
-    for item in items:
-        total += 1  # 現在のアイテムをカウント
-        if item['mimeType'] == 'application/vnd.google-apps.folder':
-            # サブフォルダの場合は再帰的にカウント
-            total += count_total_items_recursive(service, item['id'], skip_shortcuts)
-    
-    return total
+    return children
+
+def walk(service, folder_id: str, skip_shortcuts: bool = False,
+         children: Optional[Dict[str, List[Dict]]] = None,
+         fields_extra: Optional[str] = None) -> Dict[str, List[Dict]]:
+    """フォルダツリーをBFSで一度だけ走査し、親ID→子アイテム一覧のキャッシュを返す
+
+    カウント・構造表示・コピーの各フェーズでこのキャッシュを共有することで、
+    フォルダごとのfiles.list呼び出しを1回に抑える。階層ごとに兄弟フォルダを
+    まとめてlist_drive_files_multiに渡すため、list呼び出し回数は
+    フォルダ数ではなく（階層数 × チャンク数）に比例する。
+    """
+    if children is None:
+        children = {}
+    level = [folder_id]
+    while level:
+        pending = [fid for fid in level if fid not in children]
+        if pending:
+            children.update(list_drive_files_multi(service, pending, skip_shortcuts, fields_extra))
+        next_level = []
+        for fid in level:
+            for item in children.get(fid, []):
+                if item['mimeType'] == MIME_FOLDER:
+                    if item['id'] not in children and item['id'] not in next_level:
+                        next_level.append(item['id'])
+        level = next_level
+    return children
 
-def copy_file(service, file_id: str, new_parent_id: str, new_name: Optional[str] = None) -> Optional[str]:
-    """ファイルまたはフォルダをコピー"""
+@dataclass
+class ScanResult:
+    """scan()の走査結果（各種カウンタとツリーキャッシュ）"""
+    total_items: int = 0
+    folders: int = 0
+    files: int = 0
+    shortcuts: int = 0
+    size_bytes: int = 0
+    tree: Dict[str, List[Dict]] = field(default_factory=dict)
+
+def scan(service, folder_id: str, skip_shortcuts: bool = False,
+         include_size: bool = False) -> ScanResult:
+    """フォルダツリーを一度だけ走査し、カウント・サイズ・ツリーをまとめて集計
+
+    カウント用・サイズ計算用・表示用に別々の走査を繰り返さず、
+    1回のBFSで全カウンタを同時に積み上げる。sizeフィールドは
+    サイズ計算モードでのみ要求する（include_size=True）。
+    """
+    result = ScanResult()
+    result.tree = walk(service, folder_id, skip_shortcuts,
+                       fields_extra='size' if include_size else None)
+
+    for items in result.tree.values():
+        for item in items:
+            mime_type = item['mimeType']
+            result.total_items += 1
+            if mime_type == MIME_FOLDER:
+                result.folders += 1
+            elif mime_type == MIME_SHORTCUT:
+                result.shortcuts += 1
+                # ショートカットのサイズは0として扱う
+            else:
+                result.files += 1
+                if 'size' in item:
+                    result.size_bytes += int(item['size'])
+
+    return result
+
+def copy_file(service, file_id: str, new_parent_id: str, source_name: str,
+              new_name: Optional[str] = None) -> Optional[str]:
+    """ファイルまたはフォルダをコピー
+
+    呼び出し元は一覧取得で名前を把握済みなのでsource_nameとして受け取り、
+    コピー前のfiles.getは行わない（1ファイルあたりのAPI呼び出しが半減する）。
+    """
     def api_call():
-        # ファイルのメタデータを取得
-        file_metadata = service.files().get(
-            fileId=file_id,
-            fields='name,mimeType',
-            supportsAllDrives=True
-        ).execute()
-        
-        # コピー用のメタデータを作成
+        # コピー用のメタデータを作成（名前は取得済みのものを使う）
         copy_metadata = {
-            'parents': [new_parent_id]
+            'parents': [new_parent_id],
+            'name': new_name or source_name
         }
-        
-        # 新しい名前が指定されている場合は設定
-        if new_name:
-            copy_metadata['name'] = new_name
-        
-        # ファイルをコピー
+
+        # ファイルをコピー（レスポンスはidだけで十分）
         copied_file = service.files().copy(
             fileId=file_id,
             body=copy_metadata,
             supportsAllDrives=True,
-            fields='id,name'
+            fields='id'
         ).execute()
-        
-        return file_metadata, copied_file
-    
+
+        return copied_file
+
     try:
-        file_metadata, copied_file = retry_on_api_error(api_call)
-        
-        logger.info(f"コピー完了: {file_metadata['name']} -> {copied_file['name']} (ID: {copied_file['id']})")
-        
+        copied_file = retry_on_api_error(api_call)
+
+        if verbose:
+            logger.info(f"コピー完了: {source_name} -> {new_name or source_name} (ID: {copied_file['id']})")
+
         # 進捗を更新
         progress_tracker.update("file")
-        
+
         return copied_file['id']
-        
+
     except Exception as error:
         logger.error(f"ファイルコピーエラー: {error}")
         return None
 
-def copy_folder_recursive(service, source_folder_id: str, target_parent_id: str, 
-                         folder_name: str, depth: int = 0, skip_shortcuts: bool = False) -> Optional[str]:
-    """フォルダを再帰的にコピー"""
-    indent = "  " * depth
-    logger.info(f"{indent}フォルダ処理開始: {folder_name}")
-    
-    try:
-        # 新しいフォルダを作成
-        folder_metadata = {
-            'name': folder_name,
-            'mimeType': 'application/vnd.google-apps.folder',
-            'parents': [target_parent_id]
-        }
-        
-        def create_folder_api():
-            new_folder = service.files().create(
-                body=folder_metadata,
-                supportsAllDrives=True,
-                fields='id,name'
-            ).execute()
-            return new_folder
-        
-        new_folder = retry_on_api_error(create_folder_api)
-        
-        new_folder_id = new_folder['id']
-        logger.info(f"{indent}フォルダ作成完了: {folder_name} (ID: {new_folder_id})")
-        
-        # 進捗を更新（フォルダ作成）
-        progress_tracker.update("folder")
-        
-        # フォルダ内のアイテムを取得
-        items = list_drive_files(service, source_folder_id, skip_shortcuts)
-        
-        if not items:
-            logger.info(f"{indent}フォルダ {folder_name} は空です")
-            return new_folder_id
-        
-        # 各アイテムを処理
-        for item in items:
-            item_name = item['name']
-            item_id = item['id']
-            mime_type = item['mimeType']
-            
-            # ショートカットの場合はスキップ（念のため）
-            if skip_shortcuts and mime_type == 'application/vnd.google-apps.shortcut':
-                logger.info(f"{indent}ショートカットをスキップ: {item_name}")
-                continue
-            
-            if mime_type == 'application/vnd.google-apps.folder':
-                # サブフォルダの場合は再帰的にコピー
-                copy_folder_recursive(service, item_id, new_folder_id, item_name, depth + 1, skip_shortcuts)
+def copy_files_batch(service, items: List[Dict], new_parent_id: str,
+                     max_retries: int = 5) -> List[str]:
+    """複数ファイルをバッチリクエストでまとめてコピー
+
+    一覧取得で得たメタデータ(name)をそのまま使うため、
+    ファイルごとのfiles.get round-tripは発生しない。
+
+    バッチ内のサブリクエストは個別に成否が返るため、失敗した項目の
+    インデックスだけを集めてバックオフ後に再バッチする。バッチ全体を
+    そのまま再実行すると成功済みの項目まで再送されて重複コピーになる。
+
+    並行化はスレッドプール + バッチで行う。asyncioイベントループ化は
+    同期クライアント(googleapiclient)前提のコードベースと噛み合わず、
+    実効的な同時リクエスト数はどのみちDriveのクォータ
+    （レートリミッタ側）で頭打ちになるため採用していない。
+    """
+    copied_ids: List[str] = []
+    state_lock = threading.Lock()
+    failed: List[int] = []  # このラウンドで失敗した（リトライ対象の）インデックス
+
+    def on_copied(request_id, response, exception):
+        index = int(request_id)
+        item = items[index]
+        if exception is not None:
+            if isinstance(exception, HttpError) and _is_retryable_error(exception):
+                # レート制限が原因なら送信レートも引き下げる
+                if getattr(exception.resp, 'status', None) in (403, 429):
+                    rate_limiter.on_throttle()
+                # 次ラウンドでこの項目だけ再送する
+                with state_lock:
+                    failed.append(index)
             else:
-                # ファイルの場合は直接コピー
-                copy_file(service, item_id, new_folder_id)
-                time.sleep(0.1)  # API制限を避けるため少し待機
-        
-        logger.info(f"{indent}フォルダ処理完了: {folder_name}")
-        return new_folder_id
-        
+                logger.error(f"ファイルコピーエラー: {item['name']} - {exception}")
+            return
+        if verbose:
+            logger.info(f"コピー完了: {item['name']} (ID: {response['id']})")
+        with state_lock:
+            copied_ids.append(response['id'])
+        progress_tracker.update("file")
+
+    def copy_chunk(indices: List[int]):
+        # ワーカースレッドごとに専用のserviceを使う
+        thread_service = get_thread_service(service)
+        batch = thread_service.new_batch_http_request(callback=on_copied)
+        for index in indices:
+            item = items[index]
+            batch.add(
+                thread_service.files().copy(
+                    fileId=item['id'],
+                    body={'parents': [new_parent_id], 'name': item['name']},
+                    supportsAllDrives=True,
+                    fields='id'
+                ),
+                request_id=str(index)
+            )
+        # クォータはサブリクエスト単位で数えられるため件数分の重みで取得
+        rate_limiter.acquire(len(indices))
+        batch.execute()
+
+    pending = list(range(len(items)))
+    for attempt in range(max_retries + 1):
+        with state_lock:
+            failed.clear()
+
+        # BATCH_SIZE件ずつのバッチを並列に送信
+        chunks = [pending[i:i + BATCH_SIZE] for i in range(0, len(pending), BATCH_SIZE)]
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(copy_chunk, chunk): chunk for chunk in chunks}
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except HttpError as error:
+                    # バッチ自体の送信失敗。リトライ可能ならチャンクごと次ラウンドへ
+                    if _is_retryable_error(error):
+                        with state_lock:
+                            failed.extend(futures[future])
+                        logger.warning(f"バッチ送信エラー（再試行します）: {error}")
+                    else:
+                        logger.error(f"バッチコピーエラー: {error}")
+                except Exception as error:
+                    logger.error(f"バッチコピーエラー: {error}")
+
+        with state_lock:
+            pending = sorted(set(failed))
+        if not pending:
+            break
+        if attempt == max_retries:
+            logger.error(f"最大リトライ回数({max_retries})に達しました: {len(pending)}件のコピーに失敗")
+            break
+
+        # 失敗分だけフルジッターのバックオフ後に再送
+        delay = random.uniform(0, min(BACKOFF_CAP, 2.0 ** attempt))
+        logger.warning(f"{len(pending)}件のコピーに失敗。{delay:.1f}秒後に再試行します...")
+        time.sleep(delay)
+
+    return copied_ids
+
+def copy_folder_recursive(service, source_folder_id: str, target_parent_id: str,
+                         folder_name: str, depth: int = 0, skip_shortcuts: bool = False,
+                         children: Optional[Dict[str, List[Dict]]] = None) -> Optional[str]:
+    """フォルダツリーをコピー（明示的なワークキューによる反復処理）
+
+    再帰呼び出しではなくワークキューで回すため、深いツリーでも
+    RecursionErrorの心配がなく、フレーム生成のオーバーヘッドもない。
+    チェックポイントは重複し得るフォルダ名ではなくコピー元フォルダIDで記録する。
+    """
+    root_folder_id = None
+    queue = deque([(source_folder_id, target_parent_id, folder_name, depth)])
+
+    while queue:
+        src_id, parent_id, name, cur_depth = queue.popleft()
+        indent = "  " * cur_depth
+        # 処理済み（全ファイルコピー成功）のフォルダは再開時にスキップする
+        if checkpoint_manager.is_processed(src_id):
+            if verbose:
+                logger.info(f"{indent}フォルダをスキップ（処理済み）: {name}")
+            continue
+        if verbose:
+            logger.info(f"{indent}フォルダ処理開始: {name}")
+
+        try:
+            # 新しいフォルダを作成
+            folder_metadata = {
+                'name': name,
+                'mimeType': MIME_FOLDER,
+                'parents': [parent_id]
+            }
+
+            def create_folder_api():
+                new_folder = service.files().create(
+                    body=folder_metadata,
+                    supportsAllDrives=True,
+                    fields='id,name'
+                ).execute()
+                return new_folder
+
+            new_folder = retry_on_api_error(create_folder_api)
+
+            new_folder_id = new_folder['id']
+            if verbose:
+                logger.info(f"{indent}フォルダ作成完了: {name} (ID: {new_folder_id})")
+
+            if src_id == source_folder_id:
+                root_folder_id = new_folder_id
+
+            # 進捗を更新（フォルダ作成）
+            progress_tracker.update("folder")
+
+            # フォルダ内のアイテムを取得（事前走査のキャッシュがあれば再取得しない）
+            if children is not None and src_id in children:
+                items = children[src_id]
+            else:
+                items = list_drive_files(service, src_id, skip_shortcuts)
+
+            if not items:
+                if verbose:
+                    logger.info(f"{indent}フォルダ {name} は空です")
+                checkpoint_manager.add_processed_folder(src_id)
+                continue
+
+            # ファイルとサブフォルダに振り分け
+            subfolders = []
+            file_items = []
+            for item in items:
+                # ショートカットの場合はスキップ（念のため）
+                if skip_shortcuts and item['mimeType'] == MIME_SHORTCUT:
+                    if verbose:
+                        logger.info(f"{indent}ショートカットをスキップ: {item['name']}")
+                    continue
+                if item['mimeType'] == MIME_FOLDER:
+                    subfolders.append(item)
+                else:
+                    file_items.append(item)
+
+            # ファイルはバッチリクエストでまとめてコピー
+            all_copied = True
+            if file_items:
+                copied_ids = copy_files_batch(service, file_items, new_folder_id)
+                all_copied = len(copied_ids) == len(file_items)
+                if not all_copied:
+                    logger.error(f"{indent}フォルダ {name}: "
+                                 f"{len(file_items) - len(copied_ids)}件のファイルコピーに失敗")
+
+            # サブフォルダはキューに積んで順次処理
+            for item in subfolders:
+                queue.append((item['id'], new_folder_id, item['name'], cur_depth + 1))
+
+            # 全ファイルがコピーできたフォルダだけを処理済みとして記録する
+            # （失敗があれば--resume時に再処理される）
+            if all_copied:
+                checkpoint_manager.add_processed_folder(src_id)
+            if verbose:
+                logger.info(f"{indent}フォルダ処理完了: {name}")
+
+        except Exception as error:
+            logger.error(f"{indent}フォルダコピーエラー: {error}")
+            if src_id == source_folder_id:
+                return None
+
+    return root_folder_id
+
+def fetch_folder_meta(service, folder_id: str) -> Optional[Dict]:
+    """フォルダのid・名前・mimeTypeを1回のfiles.getでまとめて取得
+
+    validate_folder_idとget_folder_nameを続けて呼ぶと同じfileIdへ
+    2往復になるため、妥当性チェックと名前取得を1回で済ませる。
+    フォルダでない場合や取得に失敗した場合はNoneを返す。
+    """
+    def api_call():
+        folder_metadata = service.files().get(
+            fileId=folder_id,
+            fields='id,name,mimeType',
+            supportsAllDrives=True
+        ).execute()
+        return folder_metadata
+
+    try:
+        folder_metadata = retry_on_api_error(api_call)
     except Exception as error:
-        logger.error(f"{indent}フォルダコピーエラー: {error}")
+        logger.error(f"フォルダ情報取得エラー: {error}")
         return None
 
+    if folder_metadata['mimeType'] != MIME_FOLDER:
+        logger.error(f"指定されたID {folder_id} はフォルダではありません")
+        return None
+
+    return folder_metadata
+
 def get_folder_name(service, folder_id: str) -> Optional[str]:
     """フォルダ名を取得"""
     def api_call():
@@ -424,7 +929,7 @@ def validate_folder_id(service, folder_id: str) -> bool:
     try:
         folder_metadata = retry_on_api_error(api_call)
         
-        if folder_metadata['mimeType'] != 'application/vnd.google-apps.folder':
+        if folder_metadata['mimeType'] != MIME_FOLDER:
             logger.error(f"指定されたID {folder_id} はフォルダではありません")
             return False
         
@@ -434,97 +939,43 @@ def validate_folder_id(service, folder_id: str) -> bool:
         logger.error(f"フォルダID検証エラー: {error}")
         return False
 
-def display_folder_structure_recursive(service, folder_id: str, folder_name: str, depth: int = 0, skip_shortcuts: bool = False):
-    """フォルダ構造を再帰的に表示（ドライラン用）"""
+def display_folder_structure_recursive(tree: Dict[str, List[Dict]], folder_id: str,
+                                       folder_name: str, depth: int = 0):
+    """走査済みツリーからフォルダ構造を表示（ドライラン用）
+
+    scan()が構築したキャッシュを整形するだけで、API呼び出しは行わない。
+    """
     indent = "  " * depth
-    items = list_drive_files(service, folder_id, skip_shortcuts)
-    
+    items = tree.get(folder_id, [])
+
     if not items:
         logger.info(f"{indent}📁 {folder_name}/ (空)")
         return
-    
+
     logger.info(f"{indent}📁 {folder_name}/")
-    
+
     for item in items:
         item_name = item['name']
         mime_type = item['mimeType']
-        
-        if mime_type == 'application/vnd.google-apps.folder':
+
+        if mime_type == MIME_FOLDER:
             # フォルダの場合は再帰的に表示
-            display_folder_structure_recursive(service, item['id'], item_name, depth + 1, skip_shortcuts)
-        elif mime_type == 'application/vnd.google-apps.shortcut':
+            display_folder_structure_recursive(tree, item['id'], item_name, depth + 1)
+        elif mime_type == MIME_SHORTCUT:
             logger.info(f"{indent}  🔗 {item_name} (ショートカット)")
         else:
             logger.info(f"{indent}  📄 {item_name}")
 
-def count_items_recursive(service, folder_id: str, skip_shortcuts: bool = False) -> Tuple[int, int, int]:
-    """フォルダ内のアイテム数を再帰的にカウント（フォルダ数、ファイル数、ショートカット数）"""
-    total_folders = 0
-    total_files = 0
-    total_shortcuts = 0
-    
-    items = list_drive_files(service, folder_id, skip_shortcuts)
-    
-    for item in items:
-        mime_type = item['mimeType']
-        
-        if mime_type == 'application/vnd.google-apps.folder':
-            total_folders += 1
-            # サブフォルダ内も再帰的にカウント
-            sub_folders, sub_files, sub_shortcuts = count_items_recursive(service, item['id'], skip_shortcuts)
-            total_folders += sub_folders
-            total_files += sub_files
-            total_shortcuts += sub_shortcuts
-        elif mime_type == 'application/vnd.google-apps.shortcut':
-            total_shortcuts += 1
-        else:
-            total_files += 1
-    
-    return total_folders, total_files, total_shortcuts
-
-def calculate_folder_size_recursive(service, folder_id: str, skip_shortcuts: bool = False) -> Tuple[int, int, int, int]:
-    """フォルダ内の総サイズを再帰的に計算（バイト、フォルダ数、ファイル数、ショートカット数）"""
-    total_size = 0
-    total_folders = 0
-    total_files = 0
-    total_shortcuts = 0
-    
-    items = list_drive_files(service, folder_id, skip_shortcuts)
-    
-    for item in items:
-        mime_type = item['mimeType']
-        
-        if mime_type == 'application/vnd.google-apps.folder':
-            total_folders += 1
-            # サブフォルダ内も再帰的に計算
-            sub_size, sub_folders, sub_files, sub_shortcuts = calculate_folder_size_recursive(service, item['id'], skip_shortcuts)
-            total_size += sub_size
-            total_folders += sub_folders
-            total_files += sub_files
-            total_shortcuts += sub_shortcuts
-        elif mime_type == 'application/vnd.google-apps.shortcut':
-            total_shortcuts += 1
-            # ショートカットのサイズは0として扱う
-        else:
-            total_files += 1
-            # ファイルサイズを追加
-            if 'size' in item:
-                total_size += int(item['size'])
-    
-    return total_size, total_folders, total_files, total_shortcuts
+SIZE_NAMES = ("B", "KB", "MB", "GB", "TB")
 
 def format_size(size_bytes):
     """バイトサイズを人間が読みやすい形式に変換"""
     if size_bytes == 0:
         return "0 B"
-    
-    size_names = ["B", "KB", "MB", "GB", "TB"]
-    i = 0
-    while size_bytes >= 1024 and i < len(size_names) - 1:
-        size_bytes /= 1024.0
-        i += 1
-    
-    return f"{size_bytes:.2f} {size_names[i]}"
+
+    # 単位はlogで直接求める（ループでの逐次除算は不要）
+    i = min(len(SIZE_NAMES) - 1, int(math.log(size_bytes, 1024)))
+    return f"{size_bytes / (1024 ** i):.2f} {SIZE_NAMES[i]}"
 
 def process_size_calculation(service, folder_id: str, folder_name: str, skip_shortcuts: bool = False):
     """フォルダサイズ計算の処理"""
@@ -535,8 +986,12 @@ def process_size_calculation(service, folder_id: str, folder_name: str, skip_sho
     try:
         # フォルダサイズを計算
         logger.info("フォルダサイズを計算中...")
-        total_size, total_folders, total_files, total_shortcuts = calculate_folder_size_recursive(service, folder_id, skip_shortcuts)
-        
+        result = scan(service, folder_id, skip_shortcuts, include_size=True)
+        total_size = result.size_bytes
+        total_folders = result.folders
+        total_files = result.files
+        total_shortcuts = result.shortcuts
+
         # 結果を表示
         logger.info("=== サイズ計算結果 ===")
         logger.info(f"総サイズ: {format_size(total_size)}")
@@ -560,8 +1015,16 @@ def main():
     parser.add_argument('--resume', action='store_true', help='チェックポイントから再開')
     parser.add_argument('--clear-checkpoint', action='store_true', help='チェックポイントをクリア')
     parser.add_argument('-s', '--size', action='store_true', help='フォルダサイズ計算モード')
-    
+    parser.add_argument('--max-workers', type=int, default=8, help='ファイルコピーの並列実行ワーカー数（デフォルト: 8）')
+    parser.add_argument('--qps', type=float, default=8.0, help='Drive APIの送信レート上限（リクエスト/秒、デフォルト: 8）')
+    parser.add_argument('-v', '--verbose', action='store_true', help='アイテム単位の詳細ログを出力')
+
     args = parser.parse_args()
+
+    global max_workers, verbose
+    max_workers = max(1, args.max_workers)
+    verbose = args.verbose
+    rate_limiter.rate = rate_limiter.max_rate = max(0.5, args.qps)
     
     logger.info("=== フォルダバックアップ開始 ===")
     logger.info(f"サイズ計算モード: {args.size}")
@@ -576,22 +1039,19 @@ def main():
             creds = get_credentials()
             
             # Google Drive APIサービスを作成
-            service = build('drive', 'v3', credentials=creds)
+            service = build_drive_service(creds)
             
             # 対象フォルダID（引数で指定されたフォルダID）
             folder_id = args.target_folder_id
             logger.info(f"対象フォルダID: {folder_id}")
             
-            # フォルダの妥当性をチェック
+            # フォルダの妥当性チェックと名前取得を1回のAPI呼び出しで行う
             logger.info("フォルダの妥当性をチェック中...")
-            if not validate_folder_id(service, folder_id):
+            folder_meta = fetch_folder_meta(service, folder_id)
+            if not folder_meta:
                 sys.exit(1)
-            
-            # フォルダ名を取得
-            folder_name = get_folder_name(service, folder_id)
-            if not folder_name:
-                sys.exit(1)
-            
+            folder_name = folder_meta['name']
+
             logger.info(f"対象フォルダ名: {folder_name}")
             
             # サイズ計算を実行
@@ -618,13 +1078,15 @@ def main():
         # 認証情報を取得
         logger.info("認証情報を取得中...")
         creds = get_credentials()
+        global _credentials
+        _credentials = creds
         
         # Google Drive APIサービスを作成
-        service = build('drive', 'v3', credentials=creds)
+        service = build_drive_service(creds)
         
         # コピー先フォルダの妥当性をチェック
         logger.info("コピー先フォルダの妥当性をチェック中...")
-        if not validate_folder_id(service, args.target_folder_id):
+        if not fetch_folder_meta(service, args.target_folder_id):
             sys.exit(1)
         
         # コピー元フォルダIDを決定
@@ -640,16 +1102,13 @@ def main():
             source_folder_id = settings['BASE_FOLDER_ID']
             logger.info(f"コピー元フォルダID: {source_folder_id} (my_settings.jsonから読み込み)")
         
-        # コピー元フォルダの妥当性をチェック
+        # コピー元フォルダの妥当性チェックと名前取得を1回のAPI呼び出しで行う
         logger.info("コピー元フォルダの妥当性をチェック中...")
-        if not validate_folder_id(service, source_folder_id):
+        source_folder_meta = fetch_folder_meta(service, source_folder_id)
+        if not source_folder_meta:
             sys.exit(1)
-        
-        # コピー元フォルダ名を取得
-        source_folder_name = get_folder_name(service, source_folder_id)
-        if not source_folder_name:
-            sys.exit(1)
-        
+        source_folder_name = source_folder_meta['name']
+
         logger.info(f"コピー元フォルダ名: {source_folder_name}")
         
         if args.dry_run:
@@ -658,13 +1117,18 @@ def main():
             logger.info(f"コピー元: {source_folder_name} (ID: {source_folder_id})")
             logger.info(f"コピー先: {args.target_folder_id}")
             
+            # フォルダツリーを一度だけ走査し、表示とカウントを同時に行う
+            scan_result = scan(service, source_folder_id, args.skip_shortcuts)
+
             # フォルダ構造を再帰的に表示
             logger.info("=== フォルダ構造 ===")
-            display_folder_structure_recursive(service, source_folder_id, source_folder_name, skip_shortcuts=args.skip_shortcuts)
-            
+            display_folder_structure_recursive(scan_result.tree, source_folder_id, source_folder_name)
+
             # アイテム数をカウント
-            total_folders, total_files, total_shortcuts = count_items_recursive(service, source_folder_id, args.skip_shortcuts)
-            total_items = total_folders + total_files + total_shortcuts
+            total_folders = scan_result.folders
+            total_files = scan_result.files
+            total_shortcuts = scan_result.shortcuts
+            total_items = scan_result.total_items
             logger.info(f"=== コピー対象統計 ===")
             logger.info(f"総アイテム数: {total_items}")
             logger.info(f"フォルダ数: {total_folders}")
@@ -708,9 +1172,11 @@ def main():
                 
                 logger.info(f"バックアップフォルダ名: {backup_folder_name}")
             
-            # 総アイテム数を事前にカウント
+            # ツリーを一度だけ走査してキャッシュし、カウントとコピーで共有
             logger.info("総アイテム数をカウント中...")
-            total_items = count_total_items_recursive(service, source_folder_id, args.skip_shortcuts)
+            scan_result = scan(service, source_folder_id, args.skip_shortcuts)
+            children = scan_result.tree
+            total_items = scan_result.total_items
             logger.info(f"総アイテム数: {total_items}")
             
             # 進捗追跡を開始
@@ -727,7 +1193,8 @@ def main():
                     source_folder_id, 
                     args.target_folder_id, 
                     backup_folder_name,
-                    skip_shortcuts=args.skip_shortcuts
+                    skip_shortcuts=args.skip_shortcuts,
+                    children=children
                 )
                 
                 # バックアップフォルダIDをチェックポイントに保存
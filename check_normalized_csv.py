@@ -1,18 +1,34 @@
 import argparse
+import collections
 import csv
+import fnmatch
+import functools
 import io
+import itertools
 import logging
 import os
+import shelve
 import sys
-import chardet
+try:
+    # C実装のcchardetが入っていればそちらを使う（純Python版の数倍高速）
+    import cchardet as chardet
+except ImportError:
+    import chardet
 import time
 import re
+import threading
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timezone, timedelta
 import requests
+from requests.adapters import HTTPAdapter, Retry
 import math
 import json
+import operator
 
 import gspread
+import httplib2
+from google_auth_httplib2 import AuthorizedHttp
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 from googleapiclient.http import MediaIoBaseDownload, MediaIoBaseUpload
@@ -102,22 +118,39 @@ def filter_rows(rows, idx_pref, idx_city, idx_has_csv, idx_folder, args):
         filtered.append((i+2, pref, city, folder))
     return filtered
 
+# フォルダIDごとのファイル一覧キャッシュ（1回の実行内でのみ有効）
+_folder_listing_cache = {}
+
+def invalidate_folder_listing_cache():
+    """Drive上のファイルを変更した後に一覧キャッシュを破棄する"""
+    _folder_listing_cache.clear()
+
+# files.listのページサイズ（デフォルト100のままだとページネーション往復が増える）
+DRIVE_LIST_PAGE_SIZE = 1000
+
 def list_drive_files(service, folder_id):
+    # 同じフォルダの一覧取得はページネーション込みの往復が高くつくため
+    # 実行内でメモ化する（リネーム・削除・作成時に無効化）
+    cached = _folder_listing_cache.get(folder_id)
+    if cached is not None:
+        return cached
     files = []
     page_token = None
     while True:
-        response = service.files().list(
+        response = execute_with_retry(service.files().list(
             q=f"'{folder_id}' in parents",
             spaces='drive',
-            fields='nextPageToken, files(id, name, mimeType)',
+            fields='nextPageToken, files(id, name, mimeType, modifiedTime)',
             includeItemsFromAllDrives=True,
             supportsAllDrives=True,
+            pageSize=DRIVE_LIST_PAGE_SIZE,
             pageToken=page_token
-        ).execute()
+        ))
         files.extend(response.get('files', []))
         page_token = response.get('nextPageToken', None)
         if not page_token:
             break
+    _folder_listing_cache[folder_id] = files
     return files
 
 def find_deletion_targets(service, folder_id):
@@ -134,37 +167,175 @@ def find_deletion_targets(service, folder_id):
 def delete_drive_file(service, file_id, file_name):
     """Google Driveファイルを削除する"""
     try:
-        service.files().delete(
+        execute_with_retry(service.files().delete(
             fileId=file_id,
             supportsAllDrives=True
-        ).execute()
+        ))
+        invalidate_folder_listing_cache()
         logger.info(f"削除完了: {file_name}")
         return True
     except Exception as e:
         logger.error(f"削除失敗: {file_name} - {e}")
         return False
 
+# Drive APIのバッチリクエストに載せる最大サブリクエスト数（API上限100）
+DELETE_BATCH_SIZE = 100
+
+# 自治体ごとの処理は大半がDrive APIの応答待ちなのでスレッドで重ねる
+TARGET_MAX_WORKERS = 8
+# カウンタ辞書は複数スレッドから更新されるためロックで守る
+_counters_lock = threading.Lock()
+# スレッドごとのDriveサービス保持用（googleapiclientのhttpはスレッドセーフでない）
+_thread_local = threading.local()
+
+# 並列化でレート制限を踏まないよう、Drive API呼び出しの最小間隔を空ける
+DRIVE_MIN_CALL_INTERVAL = 0.05
+_drive_throttle_lock = threading.Lock()
+_drive_last_call = 0.0
+
+def _throttle_drive_call():
+    """Drive API呼び出しの間隔をDRIVE_MIN_CALL_INTERVAL以上に保つ"""
+    global _drive_last_call
+    with _drive_throttle_lock:
+        wait = _drive_last_call + DRIVE_MIN_CALL_INTERVAL - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        _drive_last_call = time.monotonic()
+
+# Drive APIの一時エラーを指数バックオフで再試行する際の設定
+DRIVE_RETRY_MAX_ATTEMPTS = 5
+DRIVE_RETRY_MIN_WAIT = 1
+DRIVE_RETRY_MAX_WAIT = 60
+
+def _is_retryable_drive_error(e):
+    """一時的なレート制限・サーバエラーかどうかを判定する"""
+    if not isinstance(e, HttpError):
+        return False
+    status = e.resp.status if e.resp is not None else None
+    if status in (429, 500, 503):
+        return True
+    if status == 403:
+        # 403はレート制限と権限エラーの両方で返るため理由文字列で区別する
+        reason = str(e)
+        return 'rateLimitExceeded' in reason or 'userRateLimitExceeded' in reason
+    return False
+
+def execute_with_retry(request):
+    """Drive APIリクエストを指数バックオフ付きで実行する
+
+    一時的な429/5xx（レート制限の403含む）は待って再試行し、
+    それ以外のエラーはそのまま呼び出し元へ送出する。
+    """
+    for attempt in range(1, DRIVE_RETRY_MAX_ATTEMPTS + 1):
+        _throttle_drive_call()
+        try:
+            return request.execute()
+        except HttpError as e:
+            if attempt == DRIVE_RETRY_MAX_ATTEMPTS or not _is_retryable_drive_error(e):
+                raise
+            wait = min(DRIVE_RETRY_MIN_WAIT * (2 ** (attempt - 1)), DRIVE_RETRY_MAX_WAIT)
+            logger.warning(f"Drive APIが一時エラー(status={e.resp.status})を返したため{wait}秒待って再試行します ({attempt}/{DRIVE_RETRY_MAX_ATTEMPTS})")
+            time.sleep(wait)
+
+# httplib2のディスクキャッシュ置き場（ETag付きGETの304再検証用）
+HTTP_CACHE_DIR = '.drive_http_cache'
+
+def build_drive_service(creds):
+    """ディスクキャッシュ付きHTTPクライアントでDrive APIサービスを構築
+
+    メタデータ系のGETはETag付きで返るため、ディスクキャッシュを有効に
+    しておくと変化のない再取得はIf-None-Match -> 304で済み、本文の
+    再転送が発生しない。httplib2はホストごとにkeep-alive接続を保持する
+    ので、同一スレッド内の連続呼び出しでTCP+TLSハンドシェイクを
+    繰り返すこともない。HTTP/2の多重化はgoogleapiclientの
+    トランスポートが未対応のため採っていない。
+    """
+    http = AuthorizedHttp(creds, http=httplib2.Http(cache=HTTP_CACHE_DIR))
+    return build('drive', 'v3', http=http, cache_discovery=False)
+
+def _get_worker_drive_service(creds, default_service):
+    """ワーカースレッド専用のDriveサービスを返す
+
+    httplib2のコネクションはスレッド間で共有できないため、
+    スレッドごとに別のサービスインスタンスを作って使い回す。
+    """
+    service = getattr(_thread_local, 'drive_service', None)
+    if service is None:
+        service = build_drive_service(creds) if creds else default_service
+        _thread_local.drive_service = service
+    return service
+
+# デフォルト(100KB)のままだと大きなCSVで細かいHTTPレンジ要求を繰り返すため
+# 1チャンクを10MBにして往復回数を減らす
+DOWNLOAD_CHUNK_SIZE = 10 * 1024 * 1024
+
+# これ以下のサイズは再開可能アップロード（セッション開始+本体の2往復）ではなく
+# 1往復の直接アップロードで送る
+RESUMABLE_UPLOAD_THRESHOLD = 5 * 1024 * 1024
+
+def delete_drive_files_batch(service, targets):
+    """複数のGoogle Driveファイルをバッチリクエストでまとめて削除する
+
+    1件ずつのfiles.deleteはファイル数ぶんのHTTP往復になるため、
+    最大100件を1往復で送る。削除に成功した件数を返す。
+    """
+    success_count = 0
+
+    def on_deleted(request_id, response, exception):
+        nonlocal success_count
+        name = targets[int(request_id)]['name']
+        if exception is not None:
+            logger.error(f"削除失敗: {name} - {exception}")
+        else:
+            success_count += 1
+            logger.info(f"削除完了: {name}")
+
+    for start in range(0, len(targets), DELETE_BATCH_SIZE):
+        chunk = targets[start:start + DELETE_BATCH_SIZE]
+        batch = service.new_batch_http_request(callback=on_deleted)
+        for offset, file in enumerate(chunk):
+            batch.add(
+                service.files().delete(fileId=file['id'], supportsAllDrives=True),
+                request_id=str(start + offset)
+            )
+        try:
+            _throttle_drive_call()
+            batch.execute()
+        except Exception as e:
+            logger.error(f"バッチ削除失敗: {e}")
+    if success_count:
+        invalidate_folder_listing_cache()
+    return success_count
+
 def rename_drive_file(service, file_id, new_name):
     try:
-        service.files().update(
+        execute_with_retry(service.files().update(
             fileId=file_id,
             body={'name': new_name},
             supportsAllDrives=True
-        ).execute()
+        ))
+        invalidate_folder_listing_cache()
         logger.info(f"ファイル名リネーム成功: {new_name}")
     except Exception as e:
         logger.error(f"ファイル名リネーム失敗: {e}")
 
-def download_csv_file(service, folder_id, filename):
-    files = list_drive_files(service, folder_id)
+def download_csv_file(service, folder_id, filename, files=None):
+    # 呼び出し元が一覧取得済みならそれを使い、フォルダの再スキャンを避ける
+    supplied = files is not None
+    if not supplied:
+        files = list_drive_files(service, folder_id)
     target = next((f for f in files if f['name'].lower() == filename.lower()), None)
+    if not target and supplied:
+        # リネーム直後などで渡された一覧が古い可能性があるため再取得して探す
+        files = list_drive_files(service, folder_id)
+        target = next((f for f in files if f['name'].lower() == filename.lower()), None)
     if not target:
         return None, None
     file_id = target['id']
     try:
         request = service.files().get_media(fileId=file_id, supportsAllDrives=True)
         fh = io.BytesIO()
-        downloader = MediaIoBaseDownload(fh, request)
+        downloader = MediaIoBaseDownload(fh, request, chunksize=DOWNLOAD_CHUNK_SIZE)
         done = False
         while not done:
             status, done = downloader.next_chunk()
@@ -175,25 +346,51 @@ def download_csv_file(service, folder_id, filename):
         return None, None
 
 def upload_csv_file(service, file_id, content):
-    media = MediaIoBaseUpload(io.BytesIO(content), mimetype='text/csv', resumable=True)
+    media = MediaIoBaseUpload(io.BytesIO(content), mimetype='text/csv',
+                              resumable=len(content) > RESUMABLE_UPLOAD_THRESHOLD)
     try:
-        service.files().update(
+        execute_with_retry(service.files().update(
             fileId=file_id,
             media_body=media,
             supportsAllDrives=True
-        ).execute()
+        ))
         logger.info(f"UTF-8(BOM無し)でDrive上書き成功")
     except Exception as e:
         logger.error(f"Drive上書き失敗: {e}")
 
+# エンコード判定はファイル全体を見る必要がないため先頭64KBをサンプルする
+ENCODING_SAMPLE_SIZE = 64 * 1024
+
 def detect_encoding(content):
-    res = chardet.detect(content)
+    """エンコーディングを推定する
+
+    BOM→ASCII→UTF-8の軽い判定を先に試し、どれにも当てはまらない
+    バイト列だけをchardetに掛ける（大半のCSVはUTF-8なので
+    統計的推定を通す必要がない）。
+    """
+    if content[:3] == b'\xef\xbb\xbf':
+        return 'utf-8-sig'
+    try:
+        content.decode('ascii')
+        return 'ascii'
+    except UnicodeDecodeError:
+        pass
+    try:
+        content.decode('utf-8')
+        return 'utf-8'
+    except UnicodeDecodeError:
+        pass
+    res = chardet.detect(content[:ENCODING_SAMPLE_SIZE])
     if res is None:
         return None
     return res['encoding']
 
 def haversine(lat1, lon1, lat2, lon2):
-    """2点間の距離（メートル）を計算"""
+    """2点間の距離（メートル）を計算
+
+    呼び出しはジオコーディング1件につき1回で、所要時間はネットワーク
+    往復の数十万分の一のため、numpy等によるベクトル化はしていない。
+    """
     R = 6371000  # 地球半径(m)
     phi1 = math.radians(lat1)
     phi2 = math.radians(lat2)
@@ -203,18 +400,22 @@ def haversine(lat1, lon1, lat2, lon2):
     c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
     return R * c
 
-def clean_address(pref, city, address):
-    """address先頭の重複都道府県・市区町村を除去"""
-    addr = address
-    if addr.startswith(pref):
-        addr = addr[len(pref):]
-    if addr.startswith(city):
-        addr = addr[len(city):]
-    return f"{pref}{city}{addr}"
+# ジオコーディングAPI用の共有セッション
+# （呼び出しごとのTCP+TLSハンドシェイクを避けてコネクションを使い回す。
+# 一時的な429/5xxはアダプタ側で自動リトライする）
+_session = requests.Session()
+_session.mount('https://', HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=32,
+    max_retries=Retry(total=3, backoff_factor=0.3,
+                      status_forcelist=[429, 500, 502, 503, 504])
+))
 
 def get_latlng_google(full_address):
-    url = f"https://maps.googleapis.com/maps/api/geocode/json?address={full_address}&key={GOOGLE_API_KEY}"
-    resp = requests.get(url)
+    url = "https://maps.googleapis.com/maps/api/geocode/json"
+    # paramsで渡すことで住所のURLエンコードもrequestsに任せる
+    resp = _session.get(url, params={'address': full_address, 'key': GOOGLE_API_KEY},
+                        timeout=10)
     data = resp.json()
     if data['status'] == 'OK' and data['results']:
         loc = data['results'][0]['geometry']['location']
@@ -222,20 +423,81 @@ def get_latlng_google(full_address):
     return None, None
 
 def get_latlng_gsi(full_address):
-    url = f"https://msearch.gsi.go.jp/address-search/AddressSearch?q={full_address}"
-    resp = requests.get(url)
+    url = "https://msearch.gsi.go.jp/address-search/AddressSearch"
+    resp = _session.get(url, params={'q': full_address}, timeout=10)
     data = resp.json()
     if data and isinstance(data, list) and 'geometry' in data[0]:
         coords = data[0]['geometry']['coordinates']
         return float(coords[1]), float(coords[0])
     return None, None
 
+# 正規化CSVの期待ヘッダ（note列は任意）
+BASE_HEADER = ['prefecture', 'city', 'number', 'address', 'name', 'lat', 'long']
+OPTION_HEADER = BASE_HEADER + ['note']
+_BASE_HEADER_SET = frozenset(BASE_HEADER)
+_OPTION_HEADER_SET = frozenset(OPTION_HEADER)
+
+GEOCODE_CACHE_PATH = 'geocode_cache.db'
+# ジオコーディングの先行取得で同時に処理する住所数
+GEOCODE_MAX_WORKERS = 16
+_geocode_cache = None
+# shelve(dbm)は並行アクセス非対応のため、オープンと読み書きをロックで直列化する
+_geocode_cache_lock = threading.Lock()
+
+def _open_geocode_cache():
+    """ジオコーディング結果のディスクキャッシュを遅延オープンする
+
+    呼び出し側で_geocode_cache_lockを保持していること。
+    """
+    global _geocode_cache
+    if _geocode_cache is None:
+        try:
+            _geocode_cache = shelve.open(GEOCODE_CACHE_PATH)
+        except Exception as e:
+            logger.warning(f"ジオコーディングキャッシュをオープンできませんでした: {e}")
+            # オープンできない場合はメモリのみのキャッシュにフォールバック
+            _geocode_cache = {}
+    return _geocode_cache
+
+@functools.lru_cache(maxsize=4096)
+def cached_geocode(full_address):
+    """Google/GSIのジオコーディング結果をキャッシュ付きで取得
+
+    同一住所は行をまたいでも実行をまたいでも繰り返し出現するため、
+    NFKC正規化した住所をキーにディスクキャッシュ(shelve)へ保存し、
+    ヒット時はネットワークアクセスを省略する。API失敗(Noneを含む)の
+    結果は永続化しない（次回実行時にリトライさせるため）。
+    複数ワーカーから呼ばれるため、キャッシュの読み書きはロックで守る。
+    """
+    key = unicodedata.normalize('NFKC', full_address.strip())
+    with _geocode_cache_lock:
+        cache = _open_geocode_cache()
+        try:
+            if key in cache:
+                return tuple(cache[key])
+        except Exception as e:
+            logger.warning(f"ジオコーディングキャッシュの読み込みに失敗: {e}")
+    # GoogleとGSIは互いに依存しない純粋なネットワークI/Oなので並行に投げる
+    with ThreadPoolExecutor(max_workers=2) as ex:
+        future_google = ex.submit(get_latlng_google, full_address)
+        future_gsi = ex.submit(get_latlng_gsi, full_address)
+        g_lat, g_lng = future_google.result()
+        j_lat, j_lng = future_gsi.result()
+    result = (g_lat, g_lng, j_lat, j_lng)
+    if None not in result:
+        with _geocode_cache_lock:
+            try:
+                cache[key] = result
+            except Exception as e:
+                logger.warning(f"ジオコーディングキャッシュの書き込みに失敗: {e}")
+    return result
+
 def check_csv_content(content, expected_pref, expected_city, row_num):
     # SKIP_LATLONG_UPDATE_LISTに含まれる自治体かどうかをチェック
     is_skip_target = (expected_pref, expected_city) in SKIP_LATLONG_UPDATE_LIST
     
-    # NUL文字チェック
-    if b'\x00' in content:
+    # NUL文字チェック（C実装のバイト列走査1回で判定）
+    if content.find(b'\x00') >= 0:
         if is_skip_target:
             logger.warning(f"[{row_num}] CSVにNUL文字(\\x00)が含まれています")
         else:
@@ -254,28 +516,58 @@ def check_csv_content(content, expected_pref, expected_city, row_num):
             has_bom = True
             encoding = 'utf-8-sig'
         else:
-            detect = chardet.detect(content)
-            if detect is None:
-                if is_skip_target:
-                    logger.warning(f"[{row_num}] エンコード検出失敗")
-                else:
-                    logger.error(f"[{row_num}] エンコード検出失敗")
-                return False, False, None
-            encoding = detect['encoding']
-            confidence = detect.get('confidence', 0)
-            if encoding and encoding.lower() in ('utf-8', 'ascii'):
+            # 大半のファイルはUTF-8なので、まずUTF-8としてのデコードを試みる
+            # （成功すればchardetによる推定を丸ごと省略できる）
+            try:
                 decoded = content.decode('utf-8')
                 has_bom = False
-            elif encoding and encoding.lower() in ('shift_jis', 'cp932', 'ms932', 'sjis'):
-                logger.warning(f"[{row_num}] Shift_JIS系({encoding})として仮デコード→UTF-8変換")
-                decoded = content.decode(encoding)
-                has_bom = False
-            else:
-                if is_skip_target:
-                    logger.warning(f"[{row_num}] サポート外のエンコード: {encoding} (confidence={confidence})")
-                else:
-                    logger.error(f"[{row_num}] サポート外のエンコード: {encoding} (confidence={confidence})")
-                return False, False, None
+                encoding = 'utf-8'
+            except UnicodeDecodeError:
+                # 対象は実質UTF-8かShift_JIS系のみなので、統計的推定の前に
+                # cp932として直接デコードを試す。万一の誤判定（EUC-JP等）は
+                # この後のprefecture/city列値チェックで弾かれる
+                try:
+                    decoded = content.decode('cp932')
+                    encoding = 'cp932'
+                    has_bom = False
+                    logger.warning(f"[{row_num}] Shift_JIS系(cp932)として仮デコード→UTF-8変換")
+                except UnicodeDecodeError:
+                    decoded = None
+                if decoded is None:
+                    detect = chardet.detect(content[:ENCODING_SAMPLE_SIZE])
+                    if detect is None:
+                        if is_skip_target:
+                            logger.warning(f"[{row_num}] エンコード検出失敗")
+                        else:
+                            logger.error(f"[{row_num}] エンコード検出失敗")
+                        return False, False, None
+                    encoding = detect['encoding']
+                    confidence = detect.get('confidence', 0)
+                    if encoding and encoding.lower() in ('shift_jis', 'cp932', 'ms932', 'sjis'):
+                        logger.warning(f"[{row_num}] Shift_JIS系({encoding})として仮デコード→UTF-8変換")
+                        try:
+                            decoded = content.decode(encoding)
+                        except UnicodeDecodeError:
+                            # 先頭サンプルの判定が途中で破綻するファイル
+                            # （エンコード混在など）は全体で再判定する
+                            detect = chardet.detect(content)
+                            encoding = detect['encoding'] if detect else None
+                            if not encoding:
+                                if is_skip_target:
+                                    logger.warning(f"[{row_num}] エンコード検出失敗")
+                                else:
+                                    logger.error(f"[{row_num}] エンコード検出失敗")
+                                return False, False, None
+                            logger.warning(f"[{row_num}] 全体再判定の結果 {encoding} としてデコード")
+                            decoded = content.decode(encoding)
+                        has_bom = False
+                    else:
+                        # UTF-8としてデコードできなかった時点でutf-8/ascii判定は誤検出
+                        if is_skip_target:
+                            logger.warning(f"[{row_num}] サポート外のエンコード: {encoding} (confidence={confidence})")
+                        else:
+                            logger.error(f"[{row_num}] サポート外のエンコード: {encoding} (confidence={confidence})")
+                        return False, False, None
     except Exception as e:
         if is_skip_target:
             logger.warning(f"[{row_num}] CSV decode失敗: {e}")
@@ -283,27 +575,27 @@ def check_csv_content(content, expected_pref, expected_city, row_num):
             logger.error(f"[{row_num}] CSV decode失敗: {e}")
         return False, False, None
 
+    # 一度に全行をlist化せず、イテレータのまま1行ずつ検査する
+    # （大きなCSVでもパース済み行列を丸ごとメモリに持たない）
     reader = csv.reader(io.StringIO(decoded))
-    rows = list(reader)
-    if not rows:
+    header = next(reader, None)
+    if header is None:
         has_bom = False
         if is_skip_target:
             logger.warning(f"[{row_num}] CSVが空です。")
         else:
             logger.error(f"[{row_num}] CSVが空です。")
         return False, has_bom, ''
-    header = rows[0]
-    base_header = ['prefecture','city','number','address','name','lat','long']
-    option_header = base_header + ['note']
-    # 列名の集合で比較
-    if set(header) == set(base_header):
-        if header != base_header:
+    # 列名の集合で比較（基準セットはモジュールスコープで構築済み）
+    header_set = frozenset(header)
+    if header_set == _BASE_HEADER_SET:
+        if header != BASE_HEADER:
             logger.info(f"[{row_num}] ヘッダの順番が異なります: {header}")
-        col_count = len(base_header)
-    elif set(header) == set(option_header):
-        if header != option_header:
+        col_count = len(BASE_HEADER)
+    elif header_set == _OPTION_HEADER_SET:
+        if header != OPTION_HEADER:
             logger.info(f"[{row_num}] ヘッダの順番が異なります: {header}")
-        col_count = len(option_header)
+        col_count = len(OPTION_HEADER)
     else:
         if is_skip_target:
             logger.warning(f"[{row_num}] CSVヘッダが不正: {header}")
@@ -311,17 +603,19 @@ def check_csv_content(content, expected_pref, expected_city, row_num):
             logger.error(f"[{row_num}] CSVヘッダが不正: {header}")
         return False, has_bom, decoded
     ok = True
-    idx_lat = header.index('lat') if 'lat' in header else -1
-    idx_long = header.index('long') if 'long' in header else -1
-    idx_addr = header.index('address') if 'address' in header else -1
-    idx_note = header.index('note') if 'note' in header else -1
-    idx_number = header.index('number') if 'number' in header else -1
-    idx_name = header.index('name') if 'name' in header else -1
+    # 列名→位置の辞書を一度だけ作り、以降はO(1)で引く
+    col_idx = {col: i for i, col in enumerate(header)}
+    idx_lat = col_idx.get('lat', -1)
+    idx_long = col_idx.get('long', -1)
+    idx_addr = col_idx.get('address', -1)
+    idx_note = col_idx.get('note', -1)
+    idx_number = col_idx.get('number', -1)
+    idx_name = col_idx.get('name', -1)
     
     # 重複チェック用のセット
     seen_combinations = set()
     
-    for i, fields in enumerate(rows[1:], 2):
+    for i, fields in enumerate(reader, 2):
         if col_count == 8 and len(fields) == 7:
             continue
         if len(fields) != col_count:
@@ -415,22 +709,29 @@ def parse_datetime_arg(datetime_str):
     except ValueError as e:
         raise argparse.ArgumentTypeError(f"日時形式が不正です: {e}")
 
+def _parse_drive_time(modified_time_str):
+    """Drive APIのmodifiedTime文字列を日本時間のdatetimeに変換する"""
+    if not modified_time_str:
+        return None
+    # Google Driveの日時形式: 2025-07-01T12:34:56.789Z
+    utc_time = datetime.fromisoformat(modified_time_str.replace('Z', '+00:00'))
+    # UTCから日本時間（JST）に変換
+    return utc_time.astimezone(timezone(timedelta(hours=9)))
+
 def get_file_modified_time(service, file_id):
-    """Google Driveファイルの最終更新日時を取得（日本時間で返す）"""
+    """Google Driveファイルの最終更新日時を取得（日本時間で返す）
+
+    一覧取得がmodifiedTimeを含むようになったため、基本的には
+    file_obj['modifiedTime']を_parse_drive_timeに通せば往復不要。
+    一覧が手元にない場合のフォールバックとして残している。
+    """
     try:
-        file_metadata = service.files().get(
+        file_metadata = execute_with_retry(service.files().get(
             fileId=file_id,
             fields='modifiedTime',
             supportsAllDrives=True
-        ).execute()
-        modified_time_str = file_metadata.get('modifiedTime')
-        if modified_time_str:
-            # Google Driveの日時形式: 2025-07-01T12:34:56.789Z
-            utc_time = datetime.fromisoformat(modified_time_str.replace('Z', '+00:00'))
-            # UTCから日本時間（JST）に変換
-            jst_time = utc_time.astimezone(timezone(timedelta(hours=9)))
-            return jst_time
-        return None
+        ))
+        return _parse_drive_time(file_metadata.get('modifiedTime'))
     except Exception as e:
         logger.error(f"ファイル更新日時取得失敗: {e}")
         return None
@@ -446,33 +747,59 @@ def fix_and_upload_csv(service, file_id, decoded, header, rows, pref, city, row_
         header.append('note')
         for row in rows:
             row.append('')
-    idx_lat = header.index('lat')
-    idx_long = header.index('long')
-    idx_addr = header.index('address')
-    idx_note = header.index('note')
+    col_idx = {col: i for i, col in enumerate(header)}
+    idx_lat = col_idx['lat']
+    idx_long = col_idx['long']
+    idx_addr = col_idx['address']
+    idx_note = col_idx['note']
     changed = False
     any_api_failed = False
+
+    # address先頭の重複都道府県・市区町村を除去してフル住所を作る。
+    # 同じ(pref, city)のまま行数ぶん呼ばれるため、長さと結合済み接頭辞を
+    # 束縛したクロージャにしている
+    lp, lc = len(pref), len(city)
+    prefix_pc = pref + city
+
+    def clean(addr):
+        if addr.startswith(pref):
+            addr = addr[lp:]
+        if addr.startswith(city):
+            addr = addr[lc:]
+        return prefix_pc + addr
+
+    def row_latlong_invalid(fields):
+        if len(fields) <= max(idx_lat, idx_long, idx_addr, idx_note):
+            return False
+        lat = fields[idx_lat]
+        long = fields[idx_long]
+        if lat == '' or long == '' or lat == 'None' or long == 'None':
+            return True
+        try:
+            float(lat)
+            float(long)
+            return False
+        except Exception:
+            return True
+
+    # 無効行のフル住所を先に集めて並列にジオコーディングし、キャッシュを温める
+    # （後続の逐次ループはキャッシュヒットするためネットワーク待ちが重ならない）
+    invalid_addrs = list({clean(fields[idx_addr])
+                          for fields in rows if row_latlong_invalid(fields)})
+    if len(invalid_addrs) > 1:
+        with ThreadPoolExecutor(max_workers=GEOCODE_MAX_WORKERS) as ex:
+            list(ex.map(cached_geocode, invalid_addrs))
+
     for i, fields in enumerate(rows):
         # 追加: fieldsの長さチェック
         if len(fields) <= max(idx_lat, idx_long, idx_addr, idx_note):
             logger.error(f"[{row_num}行目] {i+2}行目: 列数不足のためlat/long修正をスキップ")
             continue
-        lat = fields[idx_lat]
-        long = fields[idx_long]
-        latlong_invalid = False
-        if lat == '' or long == '' or lat == 'None' or long == 'None':
-            latlong_invalid = True
-        else:
-            try:
-                float(lat)
-                float(long)
-            except Exception:
-                latlong_invalid = True
+        latlong_invalid = row_latlong_invalid(fields)
         if latlong_invalid:
             # フル住所生成
-            full_addr = clean_address(pref, city, fields[idx_addr])
-            g_lat, g_lng = get_latlng_google(full_addr)
-            j_lat, j_lng = get_latlng_gsi(full_addr)
+            full_addr = clean(fields[idx_addr])
+            g_lat, g_lng, j_lat, j_lng = cached_geocode(full_addr)
             if g_lat is None or g_lng is None or j_lat is None or j_lng is None:
                 any_api_failed = True
                 continue
@@ -491,8 +818,8 @@ def fix_and_upload_csv(service, file_id, decoded, header, rows, pref, city, row_
     # CSV再生成・上書き
     output = io.StringIO()
     writer = csv.writer(output, lineterminator='\n')
-    writer.writerow(header)
-    writer.writerows(rows)
+    # ヘッダも含めてC実装のwriterowsの1呼び出しで書き切る
+    writer.writerows(itertools.chain([header], rows))
     content = output.getvalue().encode('utf-8')
     upload_csv_file(service, file_id, content)
     logger.info(f"[{row_num}行目] lat/long修正・Drive上書き保存完了")
@@ -510,26 +837,31 @@ def validate_latlong(fields, idx_lat, idx_long):
     except Exception:
         return True  # エラー
 
+# 東京都特別区（行政区としては扱わないため除外する）
+_TOKYO_SPECIAL_WARDS = frozenset({
+    '千代田区', '中央区', '港区', '新宿区', '文京区', '台東区', '墨田区', '江東区',
+    '品川区', '目黒区', '大田区', '世田谷区', '渋谷区', '中野区', '杉並区', '豊島区',
+    '北区', '荒川区', '板橋区', '練馬区', '足立区', '葛飾区', '江戸川区'
+})
+
+# 区で終わる部分を抽出するパターン（ソートキー生成で行ごとに使うため事前コンパイル）
+_WARD_RE = re.compile(r'([^市\s]+区)')
+
+@functools.lru_cache(maxsize=8192)
 def extract_administrative_ward(address):
-    """addressから行政区を抽出する（政令指定都市の行政区のみ）"""
-    # 東京都特別区を除外（一般的な特別区名をリストアップ）
-    tokyo_special_wards = [
-        '千代田区', '中央区', '港区', '新宿区', '文京区', '台東区', '墨田区', '江東区',
-        '品川区', '目黒区', '大田区', '世田谷区', '渋谷区', '中野区', '杉並区', '豊島区',
-        '北区', '荒川区', '板橋区', '練馬区', '足立区', '葛飾区', '江戸川区'
-    ]
-    
-    # 区で終わる部分を抽出
-    ward_pattern = r'([^市\s]+区)'
-    
-    match = re.search(ward_pattern, address)
+    """addressから行政区を抽出する（政令指定都市の行政区のみ）
+
+    同一市区町村内では住所の重複が多く、ソート中にO(N log N)回
+    呼ばれるためlru_cacheでメモ化している。
+    """
+    match = _WARD_RE.search(address)
     if match:
         ward = match.group(1)
         # 東京都特別区を除外
-        if ward in tokyo_special_wards:
+        if ward in _TOKYO_SPECIAL_WARDS:
             return None
         return ward
-    
+
     return None
 
 def create_sort_key(row, idx_address, idx_number):
@@ -551,23 +883,31 @@ def create_sort_key(row, idx_address, idx_number):
     else:
         return ('', parse_number_for_sort(number))
 
+# parse_number_for_sort用の事前コンパイル済みパターン
+_VOTING_RE = re.compile(r'第(\d+)投票区')
+_NUM_TEXT_RE = re.compile(r'^(\d+)([^\d].*)')
+_SECOND_NUM_RE = re.compile(r'^(\d+)')
+
+# 区切り文字は文字列中の出現位置ではなくこのリストの順に優先される
+_SORT_SEPARATORS = ('-', '_', ':', '.', '/', '\\', '|', '~', '+', '=', ' ')
+
+@functools.lru_cache(maxsize=16384)
 def parse_number_for_sort(number):
-    """numberをソート用にパースする（自然順ソート対応）"""
+    """numberをソート用にパースする（自然順ソート対応）
+
+    同じnumber値が繰り返し出現するためlru_cacheでメモ化している。
+    """
     if not number:
         return (0, 0, '')
-    
-    import re
-    
+
     # 「第n投票区」形式の処理
-    voting_match = re.search(r'第(\d+)投票区', number)
+    voting_match = _VOTING_RE.search(number)
     if voting_match:
         n = int(voting_match.group(1))
         return (n, 0, '')
     
     # m*n形式（*は区切り文字）の場合（純粋な数値の組み合わせ）
-    separators = ['-', '_', ':', '.', '/', '\\', '|', '~', '+', '=', ' ']
-    
-    for sep in separators:
+    for sep in _SORT_SEPARATORS:
         if sep in number:
             parts = number.split(sep, 1)  # 最初の区切り文字のみで分割
             try:
@@ -576,7 +916,7 @@ def parse_number_for_sort(number):
                 if len(parts) > 1 and parts[1].strip():
                     # 2番目の部分に区切り文字が含まれる場合は最初の数値のみを使用
                     second_part = parts[1]
-                    for inner_sep in separators:
+                    for inner_sep in _SORT_SEPARATORS:
                         if inner_sep in second_part:
                             second_part = second_part.split(inner_sep)[0]
                             break
@@ -586,21 +926,21 @@ def parse_number_for_sort(number):
                 return (m, n, '')
             except (ValueError, IndexError):
                 continue
-    
+
     # 数値＋文字列の混在パターンを抽出（例：「1番地」「10丁目」など）
-    number_text_match = re.search(r'^(\d+)([^\d].*)', number)
+    number_text_match = _NUM_TEXT_RE.search(number)
     if number_text_match:
         num_part = int(number_text_match.group(1))
         text_part = number_text_match.group(2)
         
         # 区切り文字が含まれる場合の処理
-        for sep in separators:
+        for sep in _SORT_SEPARATORS:
             if sep in text_part:
                 # 区切り文字の後に数値があるかチェック
                 parts = text_part.split(sep, 1)
                 if len(parts) > 1:
                     after_sep = parts[1]
-                    second_num_match = re.search(r'^(\d+)', after_sep)
+                    second_num_match = _SECOND_NUM_RE.search(after_sep)
                     if second_num_match:
                         second_num = int(second_num_match.group(1))
                         return (num_part, second_num, text_part)
@@ -639,7 +979,7 @@ def create_final_normalized_csv(pref, city, folder_id, drive_service, row_num):
     # 各CSVファイルを読み込んで結合
     for file_obj, csv_name in target_files:
         logger.info(f"[{row_num}行目] {csv_name} を読み込み中")
-        content, file_id = download_csv_file(drive_service, folder_id, csv_name)
+        content, file_id = download_csv_file(drive_service, folder_id, csv_name, files=files)
         if content is None:
             logger.error(f"[{row_num}行目] {csv_name} のダウンロードに失敗しました")
             continue
@@ -654,35 +994,37 @@ def create_final_normalized_csv(pref, city, folder_id, drive_service, row_num):
             logger.error(f"[{row_num}行目] {csv_name} のデコードに失敗しました: {e}")
             continue
         
-        # CSV読み込み
+        # CSV読み込み（ヘッダーだけ取り出し、データ行はイテレータのまま結合）
         reader = csv.reader(io.StringIO(decoded))
-        rows = list(reader)
-        if not rows:
+        file_header = next(reader, None)
+        if file_header is None:
             continue
-        
+
         # ヘッダーの確認
         if header is None:
-            header = rows[0]
+            header = file_header
             if 'lat' not in header or 'long' not in header:
                 logger.error(f"[{row_num}行目] lat/long列が見つかりません")
                 return
         else:
             # ヘッダーの一貫性チェック
-            if rows[0] != header:
+            if file_header != header:
                 logger.warning(f"[{row_num}行目] {csv_name} のヘッダーが異なります")
-        
+
         # データ行を追加
-        all_data_rows.extend(rows[1:])
+        all_data_rows.extend(reader)
     
     if not all_data_rows:
         logger.error(f"[{row_num}行目] 有効なデータ行がありません")
         return
     
-    # 列のインデックスを取得
-    idx_lat = header.index('lat')
-    idx_long = header.index('long')
-    idx_number = header.index('number') if 'number' in header else -1
-    idx_address = header.index('address') if 'address' in header else -1
+    # 列のインデックスを取得（行ループ内で毎回headerを走査しない）
+    col_idx = {col: i for i, col in enumerate(header)}
+    idx_lat = col_idx['lat']
+    idx_long = col_idx['long']
+    idx_number = col_idx.get('number', -1)
+    idx_address = col_idx.get('address', -1)
+    idx_name = col_idx.get('name', -1)
     
     # lat/longが空でない行のみフィルタリング + 重複行検出
     filtered_rows = []
@@ -697,7 +1039,6 @@ def create_final_normalized_csv(pref, city, folder_id, drive_service, row_num):
                     number_val = row[idx_number]
                     lat_val = row[idx_lat]
                     long_val = row[idx_long]
-                    idx_name = header.index('name') if 'name' in header else -1
                     name_val = row[idx_name] if idx_name != -1 and len(row) > idx_name else ''
                     
                     # number, name, lat, longの4つとも空でない場合のみ重複チェック
@@ -708,13 +1049,10 @@ def create_final_normalized_csv(pref, city, folder_id, drive_service, row_num):
                             # 重複行を検出
                             logger.warning(f"[{row_num}行目] {pref}{city}: 重複行を検出しました - number: {number_val}, name: {name_val}, lat: {lat_val}, long: {long_val} (今回: {i+1}行目)")
                             duplicates_removed += 1
-                            # 既存の行を削除して最新の行に置き換え（最後に現れた行を採用）
-                            prev_idx = seen_keys[dup_key]
-                            filtered_rows[prev_idx] = None  # 削除マーク
-                            seen_keys[dup_key] = len(filtered_rows)
-                            filtered_rows.append(row)
+                            # 既存位置の行を最新の行で上書き（最後に現れた行を採用）
+                            filtered_rows[seen_keys[dup_key]] = row
                         else:
-                            # 初めて出現したキーを記録
+                            # 初めて出現したキーと位置を記録
                             seen_keys[dup_key] = len(filtered_rows)
                             filtered_rows.append(row)
                     else:
@@ -724,23 +1062,24 @@ def create_final_normalized_csv(pref, city, folder_id, drive_service, row_num):
                     # number列がない場合は重複チェックしない
                     filtered_rows.append(row)
     
-    # Noneマークされた行を除去
-    filtered_rows = [row for row in filtered_rows if row is not None]
-    
     if duplicates_removed > 0:
         logger.info(f"[{row_num}行目] {pref}{city}: {duplicates_removed}件の重複行を除去しました")
     
     logger.info(f"[{row_num}行目] フィルタリング前: {len(all_data_rows)}行, フィルタリング後: {len(filtered_rows)}行")
     
     # 行政区とnumberでソート
+    # （キーを行ごとに1回だけ事前計算してからキーのみでソートする）
     if idx_number != -1:
-        filtered_rows.sort(key=lambda x: create_sort_key(x, idx_address, idx_number))
+        decorated = [(create_sort_key(row, idx_address, idx_number), row)
+                     for row in filtered_rows]
+        decorated.sort(key=operator.itemgetter(0))
+        filtered_rows = [row for _, row in decorated]
     
     # CSV生成
     output = io.StringIO()
     writer = csv.writer(output, lineterminator='\n')
-    writer.writerow(header)
-    writer.writerows(filtered_rows)
+    # ヘッダも含めてC実装のwriterowsの1呼び出しで書き切る
+    writer.writerows(itertools.chain([header], filtered_rows))
     final_content = output.getvalue().encode('utf-8')
     
     # Google Driveにアップロード
@@ -755,14 +1094,16 @@ def create_final_normalized_csv(pref, city, folder_id, drive_service, row_num):
             'parents': [folder_id],
             'mimeType': 'text/csv'
         }
-        media = MediaIoBaseUpload(io.BytesIO(final_content), mimetype='text/csv', resumable=True)
+        media = MediaIoBaseUpload(io.BytesIO(final_content), mimetype='text/csv',
+                                  resumable=len(final_content) > RESUMABLE_UPLOAD_THRESHOLD)
         try:
-            drive_service.files().create(
+            execute_with_retry(drive_service.files().create(
                 body=file_metadata,
                 media_body=media,
                 supportsAllDrives=True,
                 fields='id'
-            ).execute()
+            ))
+            invalidate_folder_listing_cache()
             logger.info(f"[{row_num}行目] {pref}{city}: 最終正規化CSV作成完了 ({len(filtered_rows)}行)")
         except Exception as e:
             logger.error(f"[{row_num}行目] 最終正規化CSVの作成に失敗しました: {e}")
@@ -774,16 +1115,18 @@ def find_csv_files(files, city, drive_service):
     misspelled2 = f"{city}_normarized.csv"   # l→r typo
     
     target_files = []
-    
+    # 名前の完全一致検索は都度の線形走査ではなく辞書引きで済ませる
+    by_name = {f['name']: f for f in files}
+
     # 1. 基本ファイル（{市区町村名}_normalized.csv）
-    base_file = next((f for f in files if f['name'] == base_csv_name), None)
+    base_file = by_name.get(base_csv_name)
     if base_file:
         target_files.append((base_file, base_csv_name))
     
     # 2. appendファイル（{市区町村名}_normalized_*append.csv）
-    import fnmatch
-    append_pattern = f"{city}_normalized_*append.csv"
-    append_files = [f for f in files if fnmatch.fnmatchcase(f['name'], append_pattern)]
+    # globをファイルごとに解釈せず、1回だけ正規表現へ変換してから照合する
+    append_re = re.compile(fnmatch.translate(f"{city}_normalized_*append.csv"))
+    append_files = [f for f in files if append_re.match(f['name'])]
     if append_files:
         logger.info(f"{city}: appendファイル {len(append_files)}件検出: {[f['name'] for f in append_files]}")
     for append_file in append_files:
@@ -791,31 +1134,30 @@ def find_csv_files(files, city, drive_service):
     
     # 3. 旧typoファイルの処理（基本ファイルが存在しない場合のみ）
     if not base_file:
-        miss_file1 = next((f for f in files if f['name'] == misspelled1), None)
-        miss_file2 = next((f for f in files if f['name'] == misspelled2), None)
+        miss_file1 = by_name.get(misspelled1)
+        miss_file2 = by_name.get(misspelled2)
         
         # ⑯: normarized誤記リネーム（競合ならリネームせず既存ファイル使う・エラーなし）
         if miss_file2:
             logger.info(f"{misspelled2} を {base_csv_name} にDrive上でリネームします")
             rename_drive_file(drive_service, miss_file2['id'], base_csv_name)
-            time.sleep(1)
             target_files.append((miss_file2, base_csv_name))
 
         # ⑫: nomalized誤記リネーム（競合ならリネームせず既存ファイル使う・エラーなし）
         if miss_file1 and not miss_file2:
             logger.info(f"{misspelled1} を {base_csv_name} にDrive上でリネームします")
             rename_drive_file(drive_service, miss_file1['id'], base_csv_name)
-            time.sleep(1)
             target_files.append((miss_file1, base_csv_name))
 
         # ⑮: 先頭余計な文字列リネーム（競合ならリネームせず既存ファイル使う・エラーなし）
-        pat = re.compile(r"^.+?" + re.escape(base_csv_name) + r"$")
-        bad_head_files = [f for f in files if pat.match(f['name']) and f['name'] != base_csv_name]
+        # 「任意の前置文字列 + 正式名」は単なる末尾一致なので正規表現は不要
+        bad_head_files = [f for f in files
+                          if f['name'].endswith(base_csv_name) and f['name'] != base_csv_name]
+        target_names = {name for _, name in target_files}
         for bad_file in bad_head_files:
-            if not any(f[1] == base_csv_name for f in target_files):
+            if base_csv_name not in target_names:
                 logger.info(f"{bad_file['name']} を {base_csv_name} にDrive上でリネームします")
                 rename_drive_file(drive_service, bad_file['id'], base_csv_name)
-                time.sleep(1)
                 target_files.append((bad_file, base_csv_name))
                 break
     
@@ -835,25 +1177,43 @@ def process_csv_file(file_obj, csv_name, pref, city, row_num, drive_service, fol
     
     # ここでlat/longバリデーションを再チェックし、エラーなら修正処理
     reader = csv.reader(io.StringIO(decoded))
-    all_rows = list(reader)
-    if not all_rows:
+    header = next(reader, None)
+    if header is None:
         logger.error(f"[{row_num}行目] CSVが空です。")
         return
-    
-    header = all_rows[0]
-    data_rows = all_rows[1:]
-    idx_lat = header.index('lat') if 'lat' in header else -1
-    idx_long = header.index('long') if 'long' in header else -1
-    
-    # 共通ロジックを使用
-    latlong_error = any(validate_latlong(fields, idx_lat, idx_long) for fields in data_rows)
+
+    col_idx = {col: i for i, col in enumerate(header)}
+    idx_lat = col_idx.get('lat', -1)
+    idx_long = col_idx.get('long', -1)
+    idx_note = col_idx.get('note', -1)
+
+    # 1回の走査でデータ行の取り込みとlat/longエラー行の抽出を同時に行う
+    # （validate_latlongのインライン展開。行数分の関数呼び出しを避ける）
+    cols_missing = idx_lat == -1 or idx_long == -1
+    max_idx = max(idx_lat, idx_long)
+    data_rows = []
+    error_rows = []
+    for fields in reader:
+        data_rows.append(fields)
+        if cols_missing or len(fields) <= max_idx:
+            error_rows.append(fields)
+            continue
+        lat = fields[idx_lat]
+        long_ = fields[idx_long]
+        if lat == '' or long_ == '':
+            error_rows.append(fields)
+            continue
+        try:
+            float(lat)
+            float(long_)
+        except Exception:
+            error_rows.append(fields)
+    latlong_error = bool(error_rows)
 
     # 追加: lat/longエラー行が全てnote=削除または不明かどうか判定
     all_latlong_error_rows_deleted_or_unknown = False
-    if latlong_error and idx_long != -1 and idx_lat != -1 and header and 'note' in header:
-        idx_note = header.index('note')
-        error_rows = [fields for fields in data_rows if validate_latlong(fields, idx_lat, idx_long)]
-        if error_rows and all((fields[idx_note] in ('削除', '不明')) for fields in error_rows if len(fields) > idx_note):
+    if error_rows and idx_long != -1 and idx_lat != -1 and idx_note != -1:
+        if all((fields[idx_note] in ('削除', '不明')) for fields in error_rows if len(fields) > idx_note):
             all_latlong_error_rows_deleted_or_unknown = True
 
     if latlong_error:
@@ -875,7 +1235,11 @@ def process_csv_file(file_obj, csv_name, pref, city, row_num, drive_service, fol
         return
     
     if has_bom or (encoding and encoding.lower() in ('shift_jis', 'cp932', 'ms932', 'sjis')):
-        cleaned_bytes = decoded.encode('utf-8')
+        if content[:3] == b'\xef\xbb\xbf' and encoding and encoding.lower() in ('utf-8', 'utf-8-sig', 'ascii'):
+            # 中身が既にUTF-8ならBOMの3バイトを落とすだけで良く、再エンコードは不要
+            cleaned_bytes = content[3:]
+        else:
+            cleaned_bytes = decoded.encode('utf-8')
         upload_csv_file(drive_service, file_id, cleaned_bytes)
         logger.info(f"[{row_num}行目] {csv_name}: BOM有/Shift-JIS系CSVをBOM無しUTF-8でDrive上書きしました")
     else:
@@ -885,7 +1249,6 @@ def process_csv_file(file_obj, csv_name, pref, city, row_num, drive_service, fol
 
     if ok:
         logger.info(f"[{row_num}行目] {csv_name}: OK")
-    time.sleep(0.1)
 
 def process_single_target(target, drive_service, opts, counters):
     """単一ターゲット（自治体）の処理"""
@@ -899,12 +1262,13 @@ def process_single_target(target, drive_service, opts, counters):
     # 削除希望ファイルの検出と処理
     deletion_targets = find_deletion_targets(drive_service, folder_id)
     if deletion_targets:
-        counters['deletion_target_count'] += len(deletion_targets)
+        with _counters_lock:
+            counters['deletion_target_count'] += len(deletion_targets)
         if opts.delete_mode:
             logger.info(f"[{row_num}行目] {pref}{city}: 削除希望ファイル {len(deletion_targets)}件を削除します")
-            for target_file in deletion_targets:
-                if delete_drive_file(drive_service, target_file['id'], target_file['name']):
-                    counters['deletion_success_count'] += 1
+            deleted = delete_drive_files_batch(drive_service, deletion_targets)
+            with _counters_lock:
+                counters['deletion_success_count'] += deleted
         else:
             logger.info(f"[{row_num}行目] {pref}{city}: 削除希望ファイル {len(deletion_targets)}件を検出しました: {[f['name'] for f in deletion_targets]}")
     
@@ -918,47 +1282,78 @@ def process_single_target(target, drive_service, opts, counters):
         misspelled1 = f"{city}_nomalized.csv"
         misspelled2 = f"{city}_normarized.csv"
         
-        correct_file = next((f for f in files if f['name'] == base_csv_name), None)
-        if not correct_file:
-            correct_file = next((f for f in files if f['name'] == misspelled1), None)
-        if not correct_file:
-            correct_file = next((f for f in files if f['name'] == misspelled2), None)
-        
+        by_name = {f['name']: f for f in files}
+        correct_file = (by_name.get(base_csv_name)
+                        or by_name.get(misspelled1)
+                        or by_name.get(misspelled2))
+
         if correct_file:
-            file_modified_time = get_file_modified_time(drive_service, correct_file['id'])
+            # 一覧取得がmodifiedTimeを含むため、通常は追加の往復なしで判定できる
+            mt = correct_file.get('modifiedTime')
+            if mt:
+                file_modified_time = _parse_drive_time(mt)
+            else:
+                file_modified_time = get_file_modified_time(drive_service, correct_file['id'])
             if file_modified_time and file_modified_time < opts.last_updated:
                 logger.info(f"スキップ: [{row_num}行目] {base_csv_name} の最終更新日時({file_modified_time.strftime('%Y-%m-%d %H:%M:%S')})が指定日時({opts.last_updated.astimezone(timezone(timedelta(hours=9))).strftime('%Y-%m-%d %H:%M:%S')})より古いため")
                 # 基本ファイルが古い場合でも、appendファイルは個別にチェックするためreturnしない
                 # 基本ファイルをtarget_filesから除外し、スキップカウントを増やす
                 target_files = [(f, n) for f, n in target_files if n != base_csv_name]
-                counters['skipped_count'] += 1
+                with _counters_lock:
+                    counters['skipped_count'] += 1
     
     # 各CSVファイルを処理
     for file_obj, csv_name in target_files:
         # 日時チェック機能が有効な場合、個別ファイルの日時チェック
         if opts.last_updated:
-            if should_skip_file_by_time(csv_name, file_obj['id'], drive_service, opts.last_updated):
-                counters['skipped_count'] += 1
+            if should_skip_file_by_time(csv_name, file_obj['id'], drive_service, opts.last_updated,
+                                        modified_time_str=file_obj.get('modifiedTime')):
+                with _counters_lock:
+                    counters['skipped_count'] += 1
                 continue
         process_csv_file(file_obj, csv_name, pref, city, row_num, drive_service, folder_id, opts)
 
+def get_file_by_name(drive_service, folder_id, name):
+    """フォルダ内からファイル名完全一致の1件を取得する
+
+    一覧キャッシュ済みのフォルダはそこから探し、未取得なら
+    フォルダ全件のlistではなく名前指定のクエリ1回で済ませる。
+    見つからなければNoneを返す。
+    """
+    cached = _folder_listing_cache.get(folder_id)
+    if cached is not None:
+        return next((f for f in cached if f['name'] == name), None)
+    escaped = name.replace("\\", "\\\\").replace("'", "\\'")
+    response = execute_with_retry(drive_service.files().list(
+        q=f"name = '{escaped}' and '{folder_id}' in parents and trashed = false",
+        spaces='drive',
+        fields='files(id, name, modifiedTime)',
+        includeItemsFromAllDrives=True,
+        supportsAllDrives=True,
+        pageSize=1
+    ))
+    found = response.get('files', [])
+    return found[0] if found else None
+
 def should_skip_by_time(pref, city, folder_id, drive_service, last_updated):
     """日時チェックによるスキップ判定"""
-    files = list_drive_files(drive_service, folder_id)
     base_csv_name = f"{city}_normalized.csv"
     misspelled1 = f"{city}_nomalized.csv"
     misspelled2 = f"{city}_normarized.csv"
-    
-    # 正しいファイル名のファイルを探す
-    correct_file = next((f for f in files if f['name'] == base_csv_name), None)
-    if not correct_file:
-        # typoファイルもチェック
-        correct_file = next((f for f in files if f['name'] == misspelled1), None)
-    if not correct_file:
-        correct_file = next((f for f in files if f['name'] == misspelled2), None)
-    
+
+    # 正しいファイル名→typoファイルの順でピンポイントに探す
+    correct_file = None
+    for candidate in (base_csv_name, misspelled1, misspelled2):
+        correct_file = get_file_by_name(drive_service, folder_id, candidate)
+        if correct_file:
+            break
+
     if correct_file:
-        file_modified_time = get_file_modified_time(drive_service, correct_file['id'])
+        mt = correct_file.get('modifiedTime')
+        if mt:
+            file_modified_time = _parse_drive_time(mt)
+        else:
+            file_modified_time = get_file_modified_time(drive_service, correct_file['id'])
         if file_modified_time and file_modified_time < last_updated:
             # ログ出力時は日本時間で表示
             logger.info(f"スキップ: {base_csv_name} の最終更新日時({file_modified_time.strftime('%Y-%m-%d %H:%M:%S')})が指定日時({last_updated.astimezone(timezone(timedelta(hours=9))).strftime('%Y-%m-%d %H:%M:%S')})より古いため")
@@ -968,27 +1363,33 @@ def should_skip_by_time(pref, city, folder_id, drive_service, last_updated):
     
     return False
 
-def should_skip_file_by_time(file_name, file_id, drive_service, last_updated):
-    """個別ファイルの日時チェックによるスキップ判定"""
-    file_modified_time = get_file_modified_time(drive_service, file_id)
+def should_skip_file_by_time(file_name, file_id, drive_service, last_updated,
+                             modified_time_str=None):
+    """個別ファイルの日時チェックによるスキップ判定
+
+    一覧取得済みのmodifiedTimeが渡されればそれを使い、
+    ファイルごとのfiles.get往復を発生させない。
+    """
+    if modified_time_str:
+        file_modified_time = _parse_drive_time(modified_time_str)
+    else:
+        file_modified_time = get_file_modified_time(drive_service, file_id)
     if file_modified_time and file_modified_time < last_updated:
         # ログ出力時は日本時間で表示
         logger.info(f"スキップ: {file_name} の最終更新日時({file_modified_time.strftime('%Y-%m-%d %H:%M:%S')})が指定日時({last_updated.astimezone(timezone(timedelta(hours=9))).strftime('%Y-%m-%d %H:%M:%S')})より古いため")
         return True
     return False
 
+_SIZE_NAMES = ["B", "KB", "MB", "GB", "TB"]
+
 def format_size(size_bytes):
     """バイトサイズを人間が読みやすい形式に変換"""
     if size_bytes == 0:
         return "0 B"
-    
-    size_names = ["B", "KB", "MB", "GB", "TB"]
-    i = 0
-    while size_bytes >= 1024 and i < len(size_names) - 1:
-        size_bytes /= 1024.0
-        i += 1
-    
-    return f"{size_bytes:.2f} {size_names[i]}"
+
+    # bit_lengthから単位の指数が直接求まるため、1024で割るループは不要
+    exp = min((size_bytes.bit_length() - 1) // 10, len(_SIZE_NAMES) - 1)
+    return f"{size_bytes / (1 << (exp * 10)):.2f} {_SIZE_NAMES[exp]}"
 
 def calculate_folder_size(service, folder_id):
     """フォルダ内の全ファイルのサイズを計算"""
@@ -997,14 +1398,15 @@ def calculate_folder_size(service, folder_id):
     page_token = None
     
     while True:
-        response = service.files().list(
+        response = execute_with_retry(service.files().list(
             q=f"'{folder_id}' in parents",
             spaces='drive',
             fields='nextPageToken, files(id, name, mimeType, size)',
             includeItemsFromAllDrives=True,
             supportsAllDrives=True,
+            pageSize=DRIVE_LIST_PAGE_SIZE,
             pageToken=page_token
-        ).execute()
+        ))
         
         for file in response.get('files', []):
             if file['mimeType'] != 'application/vnd.google-apps.folder':  # フォルダ以外
@@ -1018,18 +1420,24 @@ def calculate_folder_size(service, folder_id):
     
     return total_size, files
 
-def process_size_calculation(targets, drive_service):
+# サイズ計算で同時に処理する自治体数（フォルダごとに独立したlist呼び出しのため並列化できる）
+SIZE_MAX_WORKERS = 16
+
+def process_size_calculation(targets, drive_service, creds=None):
     """サイズ計算モードの処理"""
     logger.info("=== フォルダサイズ計算開始 ===")
-    
+
     total_size_all = 0
     folder_sizes = []
-    
-    for row_num, pref, city, folder_id in targets:
-        try:
-            folder_size, files = calculate_folder_size(drive_service, folder_id)
+    results_lock = threading.Lock()
+
+    def calc_target(target):
+        nonlocal total_size_all
+        row_num, pref, city, folder_id = target
+        service = _get_worker_drive_service(creds, drive_service)
+        folder_size, files = calculate_folder_size(service, folder_id)
+        with results_lock:
             total_size_all += folder_size
-            
             folder_sizes.append({
                 'row_num': row_num,
                 'pref': pref,
@@ -1037,12 +1445,18 @@ def process_size_calculation(targets, drive_service):
                 'size': folder_size,
                 'file_count': len(files)
             })
-            
-            logger.info(f"[{row_num}行目] {pref}{city}: {format_size(folder_size)} ({len(files)}ファイル)")
-            
-        except Exception as e:
-            logger.error(f"[{row_num}行目] {pref}{city}: サイズ計算エラー - {e}")
-    
+        logger.info(f"[{row_num}行目] {pref}{city}: {format_size(folder_size)} ({len(files)}ファイル)")
+
+    # フォルダごとのlistはレイテンシ待ちが支配的なのでスレッドで重ねる
+    with ThreadPoolExecutor(max_workers=SIZE_MAX_WORKERS) as executor:
+        future_to_target = {executor.submit(calc_target, t): t for t in targets}
+        for future in as_completed(future_to_target):
+            row_num, pref, city, _ = future_to_target[future]
+            try:
+                future.result()
+            except Exception as e:
+                logger.error(f"[{row_num}行目] {pref}{city}: サイズ計算エラー - {e}")
+
     # 結果の表示
     logger.info("=== サイズ計算結果 ===")
     logger.info(f"対象自治体数: {len(folder_sizes)}件")
@@ -1056,30 +1470,31 @@ def process_size_calculation(targets, drive_service):
     
     return total_size_all
 
+class CountFilter(logging.Filter):
+    """レベル別のログ件数を数えるフィルタ
+
+    logger.error/warningをPython関数で包む方式と違い、ログ呼び出しごとの
+    余計なフレームが増えず、スレッド化された実行でもそのまま使える。
+    """
+    def __init__(self):
+        super().__init__()
+        self.counts = collections.Counter()
+
+    def filter(self, record):
+        self.counts[record.levelno] += 1
+        return True
+
 def setup_logger_counters():
     """ログカウンターの設定"""
     counters = {
         'total_count': 0,
-        'error_count': 0,
-        'warning_count': 0,
         'skipped_count': 0,
         'deletion_target_count': 0,
         'deletion_success_count': 0
     }
-    
-    # loggerのラップ
-    orig_error = logger.error
-    orig_warning = logger.warning
-    def count_error(msg, *args, **kwargs):
-        counters['error_count'] += 1
-        orig_error(msg, *args, **kwargs)
-    def count_warning(msg, *args, **kwargs):
-        counters['warning_count'] += 1
-        orig_warning(msg, *args, **kwargs)
-    logger.error = count_error
-    logger.warning = count_warning
-    
-    return counters
+    count_filter = CountFilter()
+    logger.addFilter(count_filter)
+    return counters, count_filter
 
 def get_targets(gc, opts):
     """ターゲットの取得"""
@@ -1160,22 +1575,36 @@ def main():
 
     creds = get_credentials()
     gc = gspread.authorize(creds)
-    drive_service = build('drive', 'v3', credentials=creds)
+    drive_service = build_drive_service(creds)
 
-    counters = setup_logger_counters()
+    counters, count_filter = setup_logger_counters()
     targets = get_targets(gc, opts)
 
     # サイズ計算モードの場合
     if opts.size_mode:
-        process_size_calculation(targets, drive_service)
+        process_size_calculation(targets, drive_service, creds=creds)
         return
 
-    for target in targets:
-        counters['total_count'] += 1
-        process_single_target(target, drive_service, opts, counters)
+    # 自治体ごとの処理は独立しているためスレッドプールで並列実行する
+    def run_target(target):
+        service = _get_worker_drive_service(creds, drive_service)
+        process_single_target(target, service, opts, counters)
+
+    with ThreadPoolExecutor(max_workers=TARGET_MAX_WORKERS) as executor:
+        future_to_target = {}
+        for target in targets:
+            with _counters_lock:
+                counters['total_count'] += 1
+            future_to_target[executor.submit(run_target, target)] = target
+        for future in as_completed(future_to_target):
+            row_num, pref, city, _ = future_to_target[future]
+            try:
+                future.result()
+            except Exception as e:
+                logger.error(f"[{row_num}行目] {pref}{city}: 処理中にエラーが発生しました: {e}")
 
     logger.info("全チェック終了")
-    logger.info(f"処理自治体数: {counters['total_count']}件, エラー件数: {counters['error_count']}件, ワーニング件数: {counters['warning_count']}件, スキップ件数: {counters['skipped_count']}件")
+    logger.info(f"処理自治体数: {counters['total_count']}件, エラー件数: {count_filter.counts[logging.ERROR]}件, ワーニング件数: {count_filter.counts[logging.WARNING]}件, スキップ件数: {counters['skipped_count']}件")
     if counters['deletion_target_count'] > 0:
         logger.info(f"削除対象件数: {counters['deletion_target_count']}件, 削除成功件数: {counters['deletion_success_count']}件")
 
@@ -15,11 +15,16 @@ Googleドライブのフォルダを2026年衆院選用にコピーするスク
 
 import argparse
 import json
+from dataclasses import dataclass, field
 import logging
+import logging.handlers
 import os
+import queue
 import sys
+import threading
 import time
 import random
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Dict, List, Optional, Set, Tuple
 
 from googleapiclient.discovery import build
@@ -28,27 +33,86 @@ from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 
 # ログ設定
+# 並列実行中のワーカーがファイルI/Oで待たされないよう、各スレッドは
+# キューに積むだけにして、実際の書き込みはQueueListenerのスレッドで行う
+_log_queue = queue.Queue(-1)
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s %(levelname)s %(message)s',
-    handlers=[
-        logging.FileHandler('copy_2026_folder.log', encoding='utf-8'),
-        logging.StreamHandler(sys.stdout)
-    ]
+    handlers=[logging.handlers.QueueHandler(_log_queue)]
 )
+_log_formatter = logging.Formatter('%(asctime)s %(levelname)s %(message)s')
+_log_file_handler = logging.FileHandler('copy_2026_folder.log', encoding='utf-8')
+_log_file_handler.setFormatter(_log_formatter)
+_log_stream_handler = logging.StreamHandler(sys.stdout)
+_log_stream_handler.setFormatter(_log_formatter)
+_log_listener = logging.handlers.QueueListener(
+    _log_queue, _log_file_handler, _log_stream_handler)
 logger = logging.getLogger(__name__)
 
-# グローバル進捗カウンタ
-progress_counter = {'current': 0, 'total': 0}
-
-# グローバル統計情報
-statistics = {
-    'normalized_final_csv': {'total': 0, 'copied': 0, 'skipped': 0},
-    'normalized_final_upd_csv': {'total': 0, 'copied': 0, 'skipped': 0}
-}
-
-def retry_on_api_error(func, max_retries: int = 20, base_delay: float = 1.0):
-    """APIエラー時のリトライ機能"""
+@dataclass
+class Stats:
+    """コピー統計（複数スレッドから更新されるためロックで守る）"""
+    final_total: int = 0
+    final_copied: int = 0
+    final_skipped: int = 0
+    upd_total: int = 0
+    upd_copied: int = 0
+    upd_skipped: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+
+    def bump(self, name: str):
+        """指定のカウンタをスレッドセーフに1増やす"""
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+# コピー対象のファイル名サフィックスと除外フォルダ名
+TARGET_SUFFIXES = ('_normalized_final.csv', '_normalized_final_upd.csv')
+UPD_SUFFIX = '_normalized_final_upd.csv'
+EXCLUDED_FOLDERS = frozenset({"2025参院選後", "2025参議院選挙後"})
+FOLDER_MIME = 'application/vnd.google-apps.folder'
+# files.listの1ページあたり取得件数（Drive APIの最大値）
+LIST_PAGE_SIZE = 1000
+# files.listのq条件に付加するサーバ側フィルタ（転送量削減）
+FOLDERS_ONLY_QUERY = f" and mimeType='{FOLDER_MIME}'"
+FILES_ONLY_QUERY = f" and mimeType!='{FOLDER_MIME}'"
+
+# 市区町村フォルダを並列処理するスレッド数
+TRAVERSAL_MAX_WORKERS = 8
+# スレッドごとのDriveサービス保持用
+_thread_local = threading.local()
+# get_thread_serviceがサービスを構築するための認証情報（main()で設定）
+_credentials = None
+
+def get_thread_service(default_service):
+    """ワーカースレッド専用のDrive APIサービスを取得
+
+    googleapiclientのserviceオブジェクトはスレッドセーフではないため、
+    スレッドごとに別のserviceを構築する。認証情報が未設定の場合は
+    渡されたserviceをそのまま使う。
+    """
+    if _credentials is None:
+        return default_service
+    service = getattr(_thread_local, 'service', None)
+    if service is None:
+        service = build('drive', 'v3', credentials=_credentials,
+                        cache_discovery=False, static_discovery=True)
+        _thread_local.service = service
+    return service
+
+# リトライ時の待ち時間の上限（秒）
+RETRY_DELAY_CAP = 60.0
+
+def retry_on_api_error(func, max_retries: int = 8, base_delay: float = 1.0):
+    """APIエラー時のリトライ機能
+
+    待ち時間はdecorrelated jitter方式
+    （min(上限, uniform(base, 直前の待ち時間*3))）で決める。単純な
+    指数バックオフより早く収束し、並列ワーカーのリトライが同じ
+    タイミングに重なりにくい。レート制限（429、または
+    rateLimitExceeded系の403）はベース遅延を倍にして長めに待つ。
+    サーバがRetry-Afterを返した場合はそれに従う。
+    """
+    prev_delay = base_delay
     for attempt in range(max_retries + 1):
         try:
             return func()
@@ -57,8 +121,23 @@ def retry_on_api_error(func, max_retries: int = 20, base_delay: float = 1.0):
                 logger.error(f"最大リトライ回数({max_retries})に達しました: {error}")
                 raise
 
-            # 指数バックオフ + ジッター（ランダム要素）
-            delay = base_delay * (2 ** attempt) + random.uniform(0, 1)
+            status = error.resp.status if error.resp is not None else None
+            reason = str(error)
+            is_rate_limit = (status == 429 or
+                             (status == 403 and ('rateLimitExceeded' in reason
+                                                 or 'userRateLimitExceeded' in reason)))
+
+            delay = None
+            retry_after = error.resp.get('retry-after') if error.resp is not None else None
+            if retry_after:
+                try:
+                    delay = float(retry_after) + random.uniform(0, 1)
+                except ValueError:
+                    delay = None
+            if delay is None:
+                effective_base = base_delay * 2 if is_rate_limit else base_delay
+                delay = min(RETRY_DELAY_CAP, random.uniform(effective_base, prev_delay * 3))
+            prev_delay = delay
             logger.warning(f"APIエラー (試行 {attempt + 1}/{max_retries + 1}): {error}")
             logger.info(f"{delay:.1f}秒後にリトライします...")
             time.sleep(delay)
@@ -117,39 +196,79 @@ def get_credentials():
 
     return creds
 
-def list_drive_files(service, folder_id: str) -> List[Dict]:
-    """フォルダ内の全ファイル・フォルダを取得"""
+# フォルダ一覧のメモ化キャッシュ（(folder_id, query_filter) -> items）
+# 同じ親フォルダをexisting_folder_ids等が繰り返し一覧するのを防ぐ
+_listing_cache: Dict[Tuple[str, str], List[Dict]] = {}
+_listing_cache_lock = threading.Lock()
+
+def invalidate_listing_cache(folder_id: str):
+    """フォルダ内容を変更した後に、該当フォルダのキャッシュを破棄する"""
+    with _listing_cache_lock:
+        for key in [k for k in _listing_cache if k[0] == folder_id]:
+            del _listing_cache[key]
+
+def list_drive_files(service, folder_id: str, query_filter: str = '') -> List[Dict]:
+    """フォルダ内のファイル・フォルダを取得（実行中はフォルダ単位でメモ化）
+
+    query_filterでmimeType等のサーバ側フィルタをq条件に付加できる。
+    """
+    cache_key = (folder_id, query_filter)
+    with _listing_cache_lock:
+        cached = _listing_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
     files = []
     page_token = None
+    complete = False
 
     while True:
         def api_call():
             response = service.files().list(
-                q=f"'{folder_id}' in parents and trashed=false",
+                q=f"'{folder_id}' in parents and trashed=false{query_filter}",
                 spaces='drive',
-                fields='nextPageToken, files(id, name, mimeType, parents)',
+                fields='nextPageToken, files(id, name, mimeType, parents, modifiedTime)',
                 includeItemsFromAllDrives=True,
                 supportsAllDrives=True,
+                pageSize=LIST_PAGE_SIZE,
                 pageToken=page_token
             ).execute()
             return response
 
         try:
             response = retry_on_api_error(api_call)
-            files.extend(response.get('files', []))
+            page_files = response.get('files', [])
+            # 名前の前後の空白はここで一度だけ除去し、以降の比較・辞書構築では
+            # strip済みの名前をそのまま使う
+            for f in page_files:
+                f['name'] = f['name'].strip()
+            files.extend(page_files)
             page_token = response.get('nextPageToken', None)
 
             if not page_token:
+                complete = True
                 break
 
         except Exception as error:
             logger.error(f"ファイル一覧取得エラー: {error}")
             break
 
+    # 途中でエラーになった不完全な一覧はキャッシュしない
+    if complete:
+        with _listing_cache_lock:
+            _listing_cache[cache_key] = files
     return files
 
+# フォルダ名・検証結果のメモ化キャッシュ（実行中に変わらないメタデータ）
+_folder_name_cache: Dict[str, str] = {}
+_valid_folder_cache: Dict[str, bool] = {}
+
 def get_folder_name(service, folder_id: str) -> Optional[str]:
-    """フォルダ名を取得"""
+    """フォルダ名を取得（同じIDへの問い合わせはキャッシュする）"""
+    cached = _folder_name_cache.get(folder_id)
+    if cached is not None:
+        return cached
+
     def api_call():
         folder_metadata = service.files().get(
             fileId=folder_id,
@@ -160,13 +279,27 @@ def get_folder_name(service, folder_id: str) -> Optional[str]:
 
     try:
         folder_metadata = retry_on_api_error(api_call)
+        _folder_name_cache[folder_id] = folder_metadata['name']
         return folder_metadata['name']
     except Exception as error:
         logger.error(f"フォルダ名取得エラー: {error}")
         return None
 
+def existing_folder_ids(service, parent_id: str) -> Dict[str, str]:
+    """親フォルダ直下のフォルダ名→IDの辞書を作る
+
+    線形探索を繰り返す代わりに一覧から辞書を一度だけ構築し、
+    以降の存在チェックをO(1)にする。
+    """
+    items = list_drive_files(service, parent_id, FOLDERS_ONLY_QUERY)
+    return {item['name']: item['id'] for item in items}
+
 def validate_folder_id(service, folder_id: str) -> bool:
-    """フォルダIDの妥当性をチェック"""
+    """フォルダIDの妥当性をチェック（同じIDへの問い合わせはキャッシュする）"""
+    cached = _valid_folder_cache.get(folder_id)
+    if cached is not None:
+        return cached
+
     def api_call():
         folder_metadata = service.files().get(
             fileId=folder_id,
@@ -178,10 +311,12 @@ def validate_folder_id(service, folder_id: str) -> bool:
     try:
         folder_metadata = retry_on_api_error(api_call)
 
-        if folder_metadata['mimeType'] != 'application/vnd.google-apps.folder':
+        if folder_metadata['mimeType'] != FOLDER_MIME:
             logger.error(f"指定されたID {folder_id} はフォルダではありません")
+            _valid_folder_cache[folder_id] = False
             return False
 
+        _valid_folder_cache[folder_id] = True
         return True
 
     except Exception as error:
@@ -192,7 +327,7 @@ def create_folder(service, folder_name: str, parent_id: str) -> Optional[str]:
     """フォルダを作成"""
     folder_metadata = {
         'name': folder_name,
-        'mimeType': 'application/vnd.google-apps.folder',
+        'mimeType': FOLDER_MIME,
         'parents': [parent_id]
     }
 
@@ -206,108 +341,34 @@ def create_folder(service, folder_name: str, parent_id: str) -> Optional[str]:
 
     try:
         new_folder = retry_on_api_error(api_call)
+        invalidate_listing_cache(parent_id)
         logger.info(f"フォルダ作成: {folder_name} (ID: {new_folder['id']})")
         return new_folder['id']
     except Exception as error:
         logger.error(f"フォルダ作成エラー: {error}")
         return None
 
-def copy_file(service, file_id: str, new_parent_id: str, new_name: Optional[str] = None, show_progress: bool = False) -> Optional[str]:
-    """ファイルをコピー"""
-    def api_call():
-        # ファイルのメタデータを取得
-        file_metadata = service.files().get(
-            fileId=file_id,
-            fields='name,mimeType',
-            supportsAllDrives=True
-        ).execute()
-
-        # コピー用のメタデータを作成
-        copy_metadata = {
-            'parents': [new_parent_id]
-        }
-
-        # 新しい名前が指定されている場合は設定
-        if new_name:
-            copy_metadata['name'] = new_name
-
-        # ファイルをコピー
-        copied_file = service.files().copy(
-            fileId=file_id,
-            body=copy_metadata,
-            supportsAllDrives=True,
-            fields='id,name'
-        ).execute()
-
-        return file_metadata, copied_file
-
-    try:
-        file_metadata, copied_file = retry_on_api_error(api_call)
-
-        # 進捗表示
-        if show_progress and progress_counter['total'] > 0:
-            progress_counter['current'] += 1
-            logger.info(f"[{progress_counter['current']}/{progress_counter['total']}] ファイルコピー: {file_metadata['name']} -> {copied_file['name']} (ID: {copied_file['id']})")
-        else:
-            logger.info(f"ファイルコピー: {file_metadata['name']} -> {copied_file['name']} (ID: {copied_file['id']})")
-
-        return copied_file['id']
-    except Exception as error:
-        logger.error(f"ファイルコピーエラー: {error}")
-        return None
-
-def find_existing_folder(service, parent_id: str, folder_name: str) -> Optional[str]:
-    """親フォルダ内に同名のフォルダが既に存在するか確認"""
-    items = list_drive_files(service, parent_id)
-    for item in items:
-        if item['name'].strip() == folder_name and item['mimeType'] == 'application/vnd.google-apps.folder':
-            return item['id']
-    return None
-
-def find_existing_file(service, parent_id: str, file_name: str) -> Optional[Dict]:
-    """親フォルダ内に同名のファイルが既に存在するか確認"""
-    items = list_drive_files(service, parent_id)
-    for item in items:
-        if item['name'].strip() == file_name and item['mimeType'] != 'application/vnd.google-apps.folder':
-            return item
-    return None
-
-def get_file_modified_time(service, file_id: str) -> Optional[str]:
-    """ファイルの更新日時を取得"""
-    def api_call():
-        file_metadata = service.files().get(
-            fileId=file_id,
-            fields='modifiedTime',
-            supportsAllDrives=True
-        ).execute()
-        return file_metadata
-
-    try:
-        file_metadata = retry_on_api_error(api_call)
-        return file_metadata.get('modifiedTime')
-    except Exception as error:
-        logger.error(f"ファイル更新日時取得エラー: {error}")
-        return None
-
-def should_copy_file(service, source_file_id: str, existing_file: Optional[Dict]) -> Tuple[bool, str]:
+def should_copy_file(source_item: Dict, existing_file: Optional[Dict]) -> Tuple[bool, str]:
     """
     ファイルをコピーすべきか判定
 
+    更新日時は一覧取得時のmodifiedTimeをそのまま使うため、
+    ファイルごとのfiles.get往復は発生しない。
+
     Returns:
         (bool, str): (コピーすべきか, 理由)
     """
     if not existing_file:
         return True, "新規"
 
-    # コピー元の更新日時を取得
-    source_modified_time = get_file_modified_time(service, source_file_id)
+    # コピー元の更新日時（一覧取得済み）
+    source_modified_time = source_item.get('modifiedTime')
     if not source_modified_time:
         logger.warning("コピー元ファイルの更新日時が取得できません。コピーをスキップします。")
         return False, "コピー元の更新日時取得失敗"
 
-    # コピー先の更新日時を取得
-    existing_file_id = existing_file['id']
-    existing_modified_time = get_file_modified_time(service, existing_file_id)
+    # コピー先の更新日時（一覧取得済み）
+    existing_modified_time = existing_file.get('modifiedTime')
     if not existing_modified_time:
         logger.warning("コピー先ファイルの更新日時が取得できません。上書きコピーします。")
         return True, "コピー先の更新日時取得失敗"
@@ -318,91 +379,139 @@ def should_copy_file(service, source_file_id: str, existing_file: Optional[Dict]
     else:
         return False, f"更新なし (コピー元: {source_modified_time}, コピー先: {existing_modified_time})"
 
-def delete_file(service, file_id: str) -> bool:
-    """ファイルまたはフォルダを削除"""
-    def api_call():
-        service.files().delete(
-            fileId=file_id,
-            supportsAllDrives=True
-        ).execute()
+# Drive APIバッチに載せるサブリクエスト数
+# （公式上限は100だが、大きくしすぎると500が返りやすいため控えめにする）
+BATCH_REQUEST_SIZE = 25
+# バッチ内で失敗したサブリクエストの再送回数
+BATCH_MAX_RETRIES = 5
+
+def _is_retryable_error(error: HttpError) -> bool:
+    """リトライで回復し得るAPIエラーかどうかを判定"""
+    status = error.resp.status if error.resp is not None else None
+    reason = str(error)
+    return (status in (429, 500, 503) or
+            (status == 403 and ('rateLimitExceeded' in reason
+                                or 'userRateLimitExceeded' in reason)))
+
+def _execute_batch_with_retry(service, count: int, build_request, on_success, describe,
+                              max_retries: int = BATCH_MAX_RETRIES):
+    """バッチリクエストを実行し、失敗したサブリクエストだけ再送する
+
+    バッチ全体は200で返っても、サブリクエストは個別に403/429等で
+    失敗し得る。バッチごとretry_on_api_errorにかけると成功済みの
+    項目まで再送されるため、コールバックで失敗インデックスを集めて
+    バックオフ後にその分だけ再バッチする（backup_folder.pyと同じ方式）。
+
+    build_request(index)は送信するサブリクエストを返す。成功時は
+    on_success(index, response)が呼ばれる。describe(index)はログ用の表示。
+    """
+    failed: List[int] = []
+
+    def on_done(request_id, response, exception):
+        index = int(request_id)
+        if exception is not None:
+            if isinstance(exception, HttpError) and _is_retryable_error(exception):
+                # 次ラウンドでこの項目だけ再送する
+                failed.append(index)
+            else:
+                logger.error(f"{describe(index)}に失敗: {exception}")
+            return
+        on_success(index, response)
 
-    try:
-        retry_on_api_error(api_call)
-        logger.info(f"ファイル削除: {file_id}")
-        return True
-    except Exception as error:
-        logger.error(f"ファイル削除エラー: {error}")
-        return False
+    pending = list(range(count))
+    for attempt in range(max_retries + 1):
+        failed.clear()
+
+        for start in range(0, len(pending), BATCH_REQUEST_SIZE):
+            chunk = pending[start:start + BATCH_REQUEST_SIZE]
+            batch = service.new_batch_http_request(callback=on_done)
+            for index in chunk:
+                batch.add(build_request(index), request_id=str(index))
+            try:
+                batch.execute()
+            except HttpError as error:
+                # バッチ自体の送信失敗。リトライ可能ならチャンクごと次ラウンドへ
+                if _is_retryable_error(error):
+                    failed.extend(chunk)
+                    logger.warning(f"バッチ送信エラー（再試行します）: {error}")
+                else:
+                    logger.error(f"バッチ送信エラー: {error}")
+            except Exception as error:
+                logger.error(f"バッチ送信エラー: {error}")
 
-def count_target_files(service, source_folder_id: str) -> int:
-    """コピー対象のファイル数をカウント"""
-    total_count = 0
-
-    # 第1階層（都道府県）を取得
-    prefecture_items = list_drive_files(service, source_folder_id)
-
-    # フォルダのみをフィルタリング
-    prefecture_folders = [item for item in prefecture_items if item['mimeType'] == 'application/vnd.google-apps.folder']
-    total_prefectures = len(prefecture_folders)
-
-    logger.info(f"都道府県数: {total_prefectures}")
-
-    for pref_idx, prefecture_item in enumerate(prefecture_folders, 1):
-        prefecture_name = prefecture_item['name']
-        prefecture_id = prefecture_item['id']
-
-        # 第2階層（市区町村 または 立候補者なし）を取得
-        second_level_items = list_drive_files(service, prefecture_id)
-
-        # フォルダのみをフィルタリング
-        city_folders = [item for item in second_level_items if item['mimeType'] == 'application/vnd.google-apps.folder']
-        total_cities = len(city_folders)
-
-        for city_idx, second_item in enumerate(city_folders, 1):
-            second_name = second_item['name']
-            second_id = second_item['id']
-
-            # 進捗ログ出力
-            logger.info(f"[{pref_idx}/{total_prefectures}][{city_idx}/{total_cities}] カウント中: {prefecture_name}/{second_name}")
-
-            if second_name == "立候補者なし":
-                # 立候補者なしフォルダの場合、その下の市区町村フォルダを処理
-                city_items = list_drive_files(service, second_id)
-                for city_item in city_items:
-                    if city_item['mimeType'] != 'application/vnd.google-apps.folder':
-                        continue
-
-                    city_id = city_item['id']
-                    city_files = list_drive_files(service, city_id)
-
-                    # CSVファイルをカウント
-                    for file_item in city_files:
-                        if file_item['mimeType'] == 'application/vnd.google-apps.folder':
-                            # 「2025参院選後」または「2025参議院選挙後」フォルダの中身もチェック
-                            if file_item['name'] == "2025参院選後" or file_item['name'] == "2025参議院選挙後":
-                                inner_files = list_drive_files(service, file_item['id'])
-                                for inner_file in inner_files:
-                                    if inner_file['name'].endswith('_normalized_final_upd.csv'):
-                                        total_count += 1
-                        elif file_item['name'].endswith('_normalized_final.csv') or file_item['name'].endswith('_normalized_final_upd.csv'):
-                            total_count += 1
-            else:
-                # 通常の市区町村フォルダ
-                city_files = list_drive_files(service, second_id)
-
-                # CSVファイルをカウント
-                for file_item in city_files:
-                    if file_item['mimeType'] == 'application/vnd.google-apps.folder':
-                        # 「2025参院選後」または「2025参議院選挙後」フォルダの中身もチェック
-                        if file_item['name'] == "2025参院選後" or file_item['name'] == "2025参議院選挙後":
-                            inner_files = list_drive_files(service, file_item['id'])
-                            for inner_file in inner_files:
-                                if inner_file['name'].endswith('_normalized_final_upd.csv'):
-                                    total_count += 1
-                    elif file_item['name'].endswith('_normalized_final.csv') or file_item['name'].endswith('_normalized_final_upd.csv'):
-                        total_count += 1
-
-    return total_count
+        pending = sorted(set(failed))
+        if not pending:
+            break
+        if attempt == max_retries:
+            logger.error(f"最大リトライ回数({max_retries})に達しました: {len(pending)}件のバッチ項目が失敗")
+            break
+
+        # 失敗分だけフルジッターのバックオフ後に再送
+        delay = random.uniform(0, min(RETRY_DELAY_CAP, 2.0 ** attempt))
+        logger.warning(f"{len(pending)}件のバッチ項目が失敗。{delay:.1f}秒後に再試行します...")
+        time.sleep(delay)
+
+def create_folders_batch(service, parent_id: str, folder_names: List[str]) -> Dict[str, str]:
+    """同じ親の下に複数フォルダをまとめてバッチ作成し、名前→IDの辞書を返す"""
+    created: Dict[str, str] = {}
+
+    def build_request(index):
+        return service.files().create(
+            body={'name': folder_names[index], 'mimeType': FOLDER_MIME, 'parents': [parent_id]},
+            supportsAllDrives=True,
+            fields='id,name'
+        )
+
+    def on_created(index, response):
+        created[response['name']] = response['id']
+
+    _execute_batch_with_retry(service, len(folder_names), build_request, on_created,
+                              lambda index: f"フォルダ作成: {folder_names[index]}")
+
+    if created:
+        invalidate_listing_cache(parent_id)
+    return created
+
+def delete_files_batch(service, file_ids: List[str]) -> int:
+    """ファイル削除をまとめてバッチ実行し、成功件数を返す"""
+    success_count = 0
+
+    def build_request(index):
+        return service.files().delete(fileId=file_ids[index], supportsAllDrives=True)
+
+    def on_deleted(index, response):
+        nonlocal success_count
+        success_count += 1
+        logger.info(f"ファイル削除: {file_ids[index]}")
+
+    _execute_batch_with_retry(service, len(file_ids), build_request, on_deleted,
+                              lambda index: f"ファイル削除: {file_ids[index]}")
+    return success_count
+
+def copy_files_batch(service, copy_requests: List[Tuple[Dict, str, str, str]], stats: Stats):
+    """ファイルコピーをまとめてバッチ実行する
+
+    copy_requestsの各要素は (コピー元item, コピー先フォルダID,
+    コピー先ファイル名, 統計キーの接頭辞)。成功したものだけ統計に計上する。
+    コピー元の名前は一覧取得済みのitemから分かるため、1件ごとの
+    files.getは発行しない。
+    """
+    def build_request(index):
+        source_item, parent_id, new_name, _ = copy_requests[index]
+        return service.files().copy(
+            fileId=source_item['id'],
+            body={'parents': [parent_id], 'name': new_name},
+            supportsAllDrives=True,
+            fields='id,name'
+        )
+
+    def on_copied(index, response):
+        source_item, _, _, file_type = copy_requests[index]
+        stats.bump(f'{file_type}_copied')
+        logger.info(f"    ファイルコピー: {source_item['name']} -> {response['name']} (ID: {response['id']})")
+
+    _execute_batch_with_retry(service, len(copy_requests), build_request, on_copied,
+                              lambda index: f"ファイルコピー: {copy_requests[index][0]['name']}")
 
 def add_suffix_to_filename(filename: str, suffix: str) -> str:
     """
@@ -419,28 +528,39 @@ def add_suffix_to_filename(filename: str, suffix: str) -> str:
         return filename[:-4] + suffix + '.csv'
     return filename + suffix
 
-def process_city_folder(service, city_folder_id: str, target_city_folder_id: str, city_name: str, dry_run: bool = False, suffix: str = ''):
+def process_city_folder(service, city_folder_id: str, target_city_folder_id: str, city_name: str, stats: Stats, dry_run: bool = False, suffix: str = ''):
     """市区町村フォルダ内のCSVファイルを処理"""
     items = list_drive_files(service, city_folder_id)
 
+    # コピー先フォルダは1回だけ一覧取得し、以降は名前引きで既存判定する
+    # （ファイルごとのfind_existing_file再一覧とfiles.get往復を省く）
+    target_files_by_name = {}
+    if not dry_run and target_city_folder_id:
+        for target_item in list_drive_files(service, target_city_folder_id, FILES_ONLY_QUERY):
+            target_files_by_name[target_item['name']] = target_item
+
+    # 削除・コピーは1件ずつ実行せず、フォルダ単位でまとめてバッチ実行する
+    pending_deletes: List[str] = []
+    pending_copies: List[Tuple[Dict, str, str, str]] = []
+
     for item in items:
-        item_name = item['name'].strip()  # ファイル名の前後の空白を削除
+        item_name = item['name']
         item_id = item['id']
         mime_type = item['mimeType']
 
-        if mime_type == 'application/vnd.google-apps.folder':
+        if mime_type == FOLDER_MIME:
             # 「2025参院選後」または「2025参議院選挙後」フォルダの特別処理
-            if item_name == "2025参院選後" or item_name == "2025参議院選挙後":
+            if item_name in EXCLUDED_FOLDERS:
                 logger.info(f"  「{item_name}」フォルダを検出 - 中身の*_normalized_final_upd.csvを親フォルダにコピーします")
 
                 inner_items = list_drive_files(service, item_id)
                 logger.info(f"    フォルダ内のファイル数: {len(inner_items)}")
                 for inner_item in inner_items:
-                    inner_item_name = inner_item['name'].strip()  # ファイル名の前後の空白を削除
-                    logger.info(f"    検出ファイル: {inner_item_name} (判定: {inner_item_name.endswith('_normalized_final_upd.csv')})")
-                    if inner_item_name.endswith('_normalized_final_upd.csv'):
+                    inner_item_name = inner_item['name']
+                    logger.info(f"    検出ファイル: {inner_item_name} (判定: {inner_item_name.endswith(UPD_SUFFIX)})")
+                    if inner_item_name.endswith(UPD_SUFFIX):
                         # 統計情報をカウント
-                        statistics['normalized_final_upd_csv']['total'] += 1
+                        stats.bump('upd_total')
 
                         # サフィックスを付加したファイル名を生成
                         target_file_name = add_suffix_to_filename(inner_item_name, suffix)
@@ -448,38 +568,36 @@ def process_city_folder(service, city_folder_id: str, target_city_folder_id: str
                         if dry_run:
                             logger.info(f"    [DRY-RUN] ファイルコピー: {inner_item_name} -> {target_file_name}")
                         else:
-                            # 既存のファイルを確認
-                            existing_file = find_existing_file(service, target_city_folder_id, target_file_name)
+                            # 既存のファイルを確認（取得済み一覧から名前引き）
+                            existing_file = target_files_by_name.get(target_file_name)
 
                             # 更新日時を比較してコピーすべきか判定
-                            should_copy, reason = should_copy_file(service, inner_item['id'], existing_file)
+                            should_copy, reason = should_copy_file(inner_item, existing_file)
 
                             if should_copy:
                                 if existing_file:
                                     logger.info(f"    上書きコピー: {inner_item_name} -> {target_file_name} ({reason})")
-                                    delete_file(service, existing_file['id'])
+                                    pending_deletes.append(existing_file['id'])
                                 else:
                                     logger.info(f"    新規コピー: {inner_item_name} -> {target_file_name}")
 
-                                # ファイルをコピー（サフィックス付きファイル名で）
-                                copy_file(service, inner_item['id'], target_city_folder_id, new_name=target_file_name, show_progress=False)
-                                statistics['normalized_final_upd_csv']['copied'] += 1
-                                time.sleep(0.1)
+                                # コピーはバッチにまとめる（サフィックス付きファイル名で）
+                                pending_copies.append((inner_item, target_city_folder_id, target_file_name, 'upd'))
                             else:
                                 logger.info(f"    スキップ（更新なし）: {target_file_name} ({reason})")
-                                statistics['normalized_final_upd_csv']['skipped'] += 1
+                                stats.bump('upd_skipped')
             else:
                 # その他のフォルダはスキップ
                 logger.info(f"  スキップ（3階層以下のフォルダ）: {item_name}")
-        elif item_name.endswith('_normalized_final.csv') or item_name.endswith('_normalized_final_upd.csv'):
+        elif item_name.endswith(TARGET_SUFFIXES):
             # 対象のCSVファイルをコピー
             # 統計情報をカウント（ファイルの種類を判定）
-            if item_name.endswith('_normalized_final_upd.csv'):
-                statistics['normalized_final_upd_csv']['total'] += 1
-                file_type = 'normalized_final_upd_csv'
+            if item_name.endswith(UPD_SUFFIX):
+                stats.bump('upd_total')
+                file_type = 'upd'
             else:  # _normalized_final.csv
-                statistics['normalized_final_csv']['total'] += 1
-                file_type = 'normalized_final_csv'
+                stats.bump('final_total')
+                file_type = 'final'
 
             # サフィックスを付加したファイル名を生成
             target_file_name = add_suffix_to_filename(item_name, suffix)
@@ -487,186 +605,200 @@ def process_city_folder(service, city_folder_id: str, target_city_folder_id: str
             if dry_run:
                 logger.info(f"    [DRY-RUN] ファイルコピー: {item_name} -> {target_file_name}")
             else:
-                # 既存のファイルを確認
-                existing_file = find_existing_file(service, target_city_folder_id, target_file_name)
+                # 既存のファイルを確認（取得済み一覧から名前引き）
+                existing_file = target_files_by_name.get(target_file_name)
 
                 # 更新日時を比較してコピーすべきか判定
-                should_copy, reason = should_copy_file(service, item_id, existing_file)
+                should_copy, reason = should_copy_file(item, existing_file)
 
                 if should_copy:
                     if existing_file:
                         logger.info(f"    上書きコピー: {item_name} -> {target_file_name} ({reason})")
-                        delete_file(service, existing_file['id'])
+                        pending_deletes.append(existing_file['id'])
                     else:
                         logger.info(f"    新規コピー: {item_name} -> {target_file_name}")
 
-                    # ファイルをコピー（サフィックス付きファイル名で）
-                    copy_file(service, item_id, target_city_folder_id, new_name=target_file_name, show_progress=False)
-                    statistics[file_type]['copied'] += 1
-                    time.sleep(0.1)
+                    # コピーはバッチにまとめる（サフィックス付きファイル名で）
+                    pending_copies.append((item, target_city_folder_id, target_file_name, file_type))
                 else:
                     logger.info(f"    スキップ（更新なし）: {target_file_name} ({reason})")
-                    statistics[file_type]['skipped'] += 1
+                    stats.bump(f'{file_type}_skipped')
         else:
             # 対象外のファイルはスキップ
             logger.info(f"    スキップ（対象外のFile）: {item_name}")
 
-def copy_structure(service, source_folder_id: str, target_folder_id: str, dry_run: bool = False, suffix: str = ''):
+    # 上書き対象の旧ファイルを先に消してから、コピーをまとめて実行する
+    if pending_deletes:
+        delete_files_batch(service, pending_deletes)
+    if pending_copies:
+        copy_files_batch(service, pending_copies, stats)
+    # フォルダ内容を変更したのでコピー先のキャッシュを破棄する
+    if (pending_deletes or pending_copies) and target_city_folder_id:
+        invalidate_listing_cache(target_city_folder_id)
+
+def ensure_target_folder(service, folder_name: str, target_parent_id: str,
+                         existing_ids: Dict[str, str], dry_run: bool, indent: str) -> Optional[str]:
+    """コピー先に同名フォルダを用意し、そのIDを返す（dry_run時はNone）"""
+    if dry_run:
+        logger.info(f"{indent}[DRY-RUN] フォルダ作成: {folder_name}")
+        return None
+    existing_id = existing_ids.get(folder_name)
+    if existing_id:
+        logger.info(f"{indent}既存のフォルダを使用: {folder_name} (ID: {existing_id})")
+        return existing_id
+    new_id = create_folder(service, folder_name, target_parent_id)
+    if not new_id:
+        logger.error(f"{indent}フォルダ作成に失敗: {folder_name}")
+    return new_id
+
+def collect_city_pairs(service, prefecture_id: str, target_prefecture_id: str,
+                       dry_run: bool, city_pairs: List[Tuple[str, Optional[str], str]],
+                       progress: str, indent: str):
+    """都道府県フォルダ配下の市区町村フォルダを列挙してcity_pairsに追加
+
+    コピー先に存在しない市区町村フォルダは、1件ずつではなく
+    都道府県ごとに1回のバッチリクエストでまとめて作成する。
     """
-    フォルダ構造をコピー
+    city_folders = list_drive_files(service, prefecture_id, FOLDERS_ONLY_QUERY)
+    total_cities = len(city_folders)
+    existing_city_ids = {} if dry_run else existing_folder_ids(service, target_prefecture_id)
+    preexisting = set(existing_city_ids)
+
+    if not dry_run:
+        missing = [item['name'] for item in city_folders
+                   if item['name'] not in existing_city_ids]
+        if missing:
+            existing_city_ids.update(create_folders_batch(service, target_prefecture_id, missing))
+
+    for city_idx, city_item in enumerate(city_folders, 1):
+        city_name = city_item['name']
+        logger.info(f"{indent}{progress}[{city_idx}/{total_cities}] 市区町村フォルダ: {city_name}")
+
+        if dry_run:
+            logger.info(f"{indent}  [DRY-RUN] フォルダ作成: {city_name}")
+            city_pairs.append((city_item['id'], None, city_name))
+            continue
+
+        target_city_id = existing_city_ids.get(city_name)
+        if not target_city_id:
+            logger.error(f"{indent}  フォルダ作成に失敗: {city_name}")
+            continue
+        if city_name in preexisting:
+            logger.info(f"{indent}  既存のフォルダを使用: {city_name} (ID: {target_city_id})")
+        else:
+            logger.info(f"{indent}  フォルダ作成: {city_name} (ID: {target_city_id})")
+        city_pairs.append((city_item['id'], target_city_id, city_name))
 
-    処理対象:
-    - {prefecture}/{city} の構造
-    - 立候補者なし/{prefecture}/{city} の構造
-    - *_normalized_final.csv または *_normalized_final_upd.csv のみ
+def discover_city_pairs(service, source_folder_id: str, target_folder_id: str,
+                        dry_run: bool) -> List[Tuple[str, Optional[str], str]]:
+    """処理対象の市区町村フォルダを幅優先で列挙
 
-    特別な処理:
-    - 「2025参院選後」または「2025参議院選挙後」フォルダは除外、その中の*_normalized_final_upd.csvのみを親フォルダにコピー
-    - suffixが指定されている場合、コピー先ファイル名に付加
+    第1〜2階層（立候補者なしの場合は第3階層まで）を走査し、コピー先の
+    都道府県・市区町村フォルダはこの時点で作成しておく。返り値は
+    (コピー元市区町村ID, コピー先市区町村ID, 市区町村名) のリストで、
+    CSVファイルの処理は呼び出し側が市区町村単位で並列実行できる。
     """
-    logger.info("=== フォルダ構造のコピー開始 ===")
+    city_pairs: List[Tuple[str, Optional[str], str]] = []
 
     # 第1階層（都道府県 または 立候補者なし）を取得
-    first_level_items = list_drive_files(service, source_folder_id)
-
-    # フォルダのみをフィルタリング
-    first_level_folders = [item for item in first_level_items if item['mimeType'] == 'application/vnd.google-apps.folder']
+    first_level_folders = list_drive_files(service, source_folder_id, FOLDERS_ONLY_QUERY)
     total_first_level = len(first_level_folders)
 
     logger.info(f"第1階層フォルダ数: {total_first_level}")
 
+    # コピー先直下の既存フォルダ辞書を一度だけ構築（存在チェック用）
+    existing_first_level_ids = {} if dry_run else existing_folder_ids(service, target_folder_id)
+
     for first_idx, first_item in enumerate(first_level_folders, 1):
-        first_name = first_item['name'].strip()  # フォルダ名の前後の空白を削除
+        first_name = first_item['name']
         first_id = first_item['id']
 
         if first_name == "立候補者なし":
             # 立候補者なしフォルダの場合
             logger.info(f"[{first_idx}/{total_first_level}] 立候補者なしフォルダ: {first_name}")
 
-            # 立候補者なしフォルダを作成または既存フォルダを使用
-            if dry_run:
-                logger.info(f"  [DRY-RUN] フォルダ作成: {first_name}")
-                target_nocandidate_id = None
-            else:
-                existing_nocandidate_id = find_existing_folder(service, target_folder_id, first_name)
-                if existing_nocandidate_id:
-                    logger.info(f"  既存のフォルダを使用: {first_name} (ID: {existing_nocandidate_id})")
-                    target_nocandidate_id = existing_nocandidate_id
-                else:
-                    target_nocandidate_id = create_folder(service, first_name, target_folder_id)
-                    if not target_nocandidate_id:
-                        logger.error(f"  フォルダ作成に失敗: {first_name}")
-                        continue
+            target_nocandidate_id = ensure_target_folder(service, first_name, target_folder_id,
+                                                         existing_first_level_ids, dry_run, "  ")
+            if not dry_run and not target_nocandidate_id:
+                continue
 
             # 立候補者なしフォルダの下の都道府県フォルダを処理
-            nocandidate_prefecture_items = list_drive_files(service, first_id)
-            nocandidate_prefecture_folders = [item for item in nocandidate_prefecture_items if item['mimeType'] == 'application/vnd.google-apps.folder']
+            nocandidate_prefecture_folders = list_drive_files(service, first_id, FOLDERS_ONLY_QUERY)
             total_nocandidate_prefectures = len(nocandidate_prefecture_folders)
 
             logger.info(f"  立候補者なし配下の都道府県数: {total_nocandidate_prefectures}")
 
+            existing_nc_pref_ids = {} if dry_run else existing_folder_ids(service, target_nocandidate_id)
+
             for nc_pref_idx, nc_prefecture_item in enumerate(nocandidate_prefecture_folders, 1):
-                nc_prefecture_name = nc_prefecture_item['name'].strip()  # フォルダ名の前後の空白を削除
-                nc_prefecture_id = nc_prefecture_item['id']
+                nc_prefecture_name = nc_prefecture_item['name']
 
                 logger.info(f"  [{first_idx}/{total_first_level}][{nc_pref_idx}/{total_nocandidate_prefectures}] 都道府県フォルダ: {nc_prefecture_name}")
 
-                # 都道府県フォルダを作成または既存フォルダを使用
-                if dry_run:
-                    logger.info(f"    [DRY-RUN] フォルダ作成: {nc_prefecture_name}")
-                    target_nc_prefecture_id = None
-                else:
-                    existing_nc_prefecture_id = find_existing_folder(service, target_nocandidate_id, nc_prefecture_name)
-                    if existing_nc_prefecture_id:
-                        logger.info(f"    既存のフォルダを使用: {nc_prefecture_name} (ID: {existing_nc_prefecture_id})")
-                        target_nc_prefecture_id = existing_nc_prefecture_id
-                    else:
-                        target_nc_prefecture_id = create_folder(service, nc_prefecture_name, target_nocandidate_id)
-                        if not target_nc_prefecture_id:
-                            logger.error(f"    フォルダ作成に失敗: {nc_prefecture_name}")
-                            continue
-
-                # 第3階層（市区町村）を取得
-                nc_city_items = list_drive_files(service, nc_prefecture_id)
-                nc_city_folders = [item for item in nc_city_items if item['mimeType'] == 'application/vnd.google-apps.folder']
-                total_nc_cities = len(nc_city_folders)
-
-                for nc_city_idx, nc_city_item in enumerate(nc_city_folders, 1):
-                    nc_city_name = nc_city_item['name'].strip()  # フォルダ名の前後の空白を削除
-                    nc_city_id = nc_city_item['id']
-
-                    logger.info(f"    [{first_idx}/{total_first_level}][{nc_pref_idx}/{total_nocandidate_prefectures}][{nc_city_idx}/{total_nc_cities}] 市区町村フォルダ: {nc_city_name}")
-
-                    # 市区町村フォルダを作成または既存フォルダを使用
-                    if dry_run:
-                        logger.info(f"      [DRY-RUN] フォルダ作成: {nc_city_name}")
-                        # ドライランでもCSVファイルを検出して表示
-                        process_city_folder(service, nc_city_id, None, nc_city_name, dry_run, suffix)
-                    else:
-                        existing_nc_city_id = find_existing_folder(service, target_nc_prefecture_id, nc_city_name)
-                        if existing_nc_city_id:
-                            logger.info(f"      既存のフォルダを使用: {nc_city_name} (ID: {existing_nc_city_id})")
-                            target_nc_city_id = existing_nc_city_id
-                        else:
-                            target_nc_city_id = create_folder(service, nc_city_name, target_nc_prefecture_id)
-                            if not target_nc_city_id:
-                                logger.error(f"      フォルダ作成に失敗: {nc_city_name}")
-                                continue
+                target_nc_prefecture_id = ensure_target_folder(service, nc_prefecture_name, target_nocandidate_id,
+                                                               existing_nc_pref_ids, dry_run, "    ")
+                if not dry_run and not target_nc_prefecture_id:
+                    continue
 
-                        # CSVファイルを処理
-                        process_city_folder(service, nc_city_id, target_nc_city_id, nc_city_name, dry_run, suffix)
+                # 第3階層（市区町村）を列挙
+                collect_city_pairs(service, nc_prefecture_item['id'], target_nc_prefecture_id,
+                                   dry_run, city_pairs,
+                                   f"[{first_idx}/{total_first_level}][{nc_pref_idx}/{total_nocandidate_prefectures}]",
+                                   "    ")
 
         else:
             # 通常の都道府県フォルダ
             prefecture_name = first_name
-            prefecture_id = first_id
 
             logger.info(f"[{first_idx}/{total_first_level}] 都道府県フォルダ: {prefecture_name}")
 
-            # 都道府県フォルダを作成または既存フォルダを使用
-            if dry_run:
-                logger.info(f"  [DRY-RUN] フォルダ作成: {prefecture_name}")
-                target_prefecture_id = None
-            else:
-                existing_prefecture_id = find_existing_folder(service, target_folder_id, prefecture_name)
-                if existing_prefecture_id:
-                    logger.info(f"  既存のフォルダを使用: {prefecture_name} (ID: {existing_prefecture_id})")
-                    target_prefecture_id = existing_prefecture_id
-                else:
-                    target_prefecture_id = create_folder(service, prefecture_name, target_folder_id)
-                    if not target_prefecture_id:
-                        logger.error(f"  フォルダ作成に失敗: {prefecture_name}")
-                        continue
-
-            # 第2階層（市区町村）を取得
-            city_items = list_drive_files(service, prefecture_id)
-            city_folders = [item for item in city_items if item['mimeType'] == 'application/vnd.google-apps.folder']
-            total_cities = len(city_folders)
-
-            for city_idx, city_item in enumerate(city_folders, 1):
-                city_name = city_item['name'].strip()  # フォルダ名の前後の空白を削除
-                city_id = city_item['id']
-
-                logger.info(f"  [{first_idx}/{total_first_level}][{city_idx}/{total_cities}] 市区町村フォルダ: {city_name}")
-
-                # 市区町村フォルダを作成または既存フォルダを使用
-                if dry_run:
-                    logger.info(f"    [DRY-RUN] フォルダ作成: {city_name}")
-                    # ドライランでもCSVファイルを検出して表示
-                    process_city_folder(service, city_id, None, city_name, dry_run, suffix)
-                else:
-                    existing_city_id = find_existing_folder(service, target_prefecture_id, city_name)
-                    if existing_city_id:
-                        logger.info(f"    既存のフォルダを使用: {city_name} (ID: {existing_city_id})")
-                        target_city_id = existing_city_id
-                    else:
-                        target_city_id = create_folder(service, city_name, target_prefecture_id)
-                        if not target_city_id:
-                            logger.error(f"    フォルダ作成に失敗: {city_name}")
-                            continue
+            target_prefecture_id = ensure_target_folder(service, prefecture_name, target_folder_id,
+                                                        existing_first_level_ids, dry_run, "  ")
+            if not dry_run and not target_prefecture_id:
+                continue
+
+            # 第2階層（市区町村）を列挙
+            collect_city_pairs(service, first_id, target_prefecture_id,
+                               dry_run, city_pairs,
+                               f"[{first_idx}/{total_first_level}]",
+                               "  ")
+
+    return city_pairs
+
+def copy_structure(service, source_folder_id: str, target_folder_id: str, stats: Stats, dry_run: bool = False, suffix: str = ''):
+    """
+    フォルダ構造をコピー
 
-                    # CSVファイルを処理
-                    process_city_folder(service, city_id, target_city_id, city_name, dry_run, suffix)
+    処理対象:
+    - {prefecture}/{city} の構造
+    - 立候補者なし/{prefecture}/{city} の構造
+    - *_normalized_final.csv または *_normalized_final_upd.csv のみ
+
+    特別な処理:
+    - 「2025参院選後」または「2025参議院選挙後」フォルダは除外、その中の*_normalized_final_upd.csvのみを親フォルダにコピー
+    - suffixが指定されている場合、コピー先ファイル名に付加
+
+    まず市区町村フォルダまでを走査して対象を列挙し、その後
+    市区町村単位でCSVファイルの処理を並列実行する。
+    """
+    logger.info("=== フォルダ構造のコピー開始 ===")
+
+    city_pairs = discover_city_pairs(service, source_folder_id, target_folder_id, dry_run)
+    logger.info(f"処理対象の市区町村フォルダ数: {len(city_pairs)}")
+
+    def process_pair(pair):
+        src_city_id, target_city_id, city_name = pair
+        worker_service = get_thread_service(service)
+        process_city_folder(worker_service, src_city_id, target_city_id, city_name, stats, dry_run, suffix)
+
+    # 市区町村ごとの処理は独立しているため並列実行する
+    with ThreadPoolExecutor(max_workers=TRAVERSAL_MAX_WORKERS) as executor:
+        futures = {executor.submit(process_pair, pair): pair for pair in city_pairs}
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except Exception as error:
+                logger.error(f"市区町村フォルダ処理エラー: {futures[future][2]} - {error}")
 
     logger.info("=== フォルダ構造のコピー完了 ===")
 
@@ -678,6 +810,8 @@ def main():
 
     args = parser.parse_args()
 
+    _log_listener.start()
+
     logger.info("=== フォルダコピー開始 ===")
     logger.info(f"ドライラン: {args.dry_run}")
     if args.suffix:
@@ -689,7 +823,11 @@ def main():
         creds = get_credentials()
 
         # Google Drive APIサービスを作成
-        service = build('drive', 'v3', credentials=creds)
+        # （ワーカースレッドが自分用のserviceを構築できるよう認証情報も保持）
+        global _credentials
+        _credentials = creds
+        service = build('drive', 'v3', credentials=creds,
+                        cache_discovery=False, static_discovery=True)
 
         # 設定を読み込み
         settings = load_settings()
@@ -730,23 +868,20 @@ def main():
 
         logger.info(f"コピー元フォルダ名: {source_folder_name}")
 
-        # 統計情報をリセット
-        statistics['normalized_final_csv'] = {'total': 0, 'copied': 0, 'skipped': 0}
-        statistics['normalized_final_upd_csv'] = {'total': 0, 'copied': 0, 'skipped': 0}
-
         # フォルダ構造をコピー
-        copy_structure(service, source_folder_id, target_folder_id, args.dry_run, args.suffix)
+        stats = Stats()
+        copy_structure(service, source_folder_id, target_folder_id, stats, args.dry_run, args.suffix)
 
         # 統計情報を表示
         logger.info("=== 統計情報 ===")
         logger.info(f"*_normalized_final.csv:")
-        logger.info(f"  総数: {statistics['normalized_final_csv']['total']}")
-        logger.info(f"  コピー済み: {statistics['normalized_final_csv']['copied']}")
-        logger.info(f"  スキップ: {statistics['normalized_final_csv']['skipped']}")
+        logger.info(f"  総数: {stats.final_total}")
+        logger.info(f"  コピー済み: {stats.final_copied}")
+        logger.info(f"  スキップ: {stats.final_skipped}")
         logger.info(f"*_normalized_final_upd.csv:")
-        logger.info(f"  総数: {statistics['normalized_final_upd_csv']['total']}")
-        logger.info(f"  コピー済み: {statistics['normalized_final_upd_csv']['copied']}")
-        logger.info(f"  スキップ: {statistics['normalized_final_upd_csv']['skipped']}")
+        logger.info(f"  総数: {stats.upd_total}")
+        logger.info(f"  コピー済み: {stats.upd_copied}")
+        logger.info(f"  スキップ: {stats.upd_skipped}")
 
         if args.dry_run:
             logger.info("=== ドライラン完了 ===")
@@ -759,6 +894,9 @@ def main():
         import traceback
         traceback.print_exc()
         sys.exit(1)
+    finally:
+        # キューに残ったログを書き切ってからリスナーを止める
+        _log_listener.stop()
 
 if __name__ == "__main__":
     main()
@@ -17,8 +17,11 @@ import json
 import logging
 import os
 import sys
+import tempfile
+import threading
 import time
 import random
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Dict, List, Optional, Tuple
 
 from googleapiclient.discovery import build
@@ -37,6 +40,32 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# フォルダ探索を並列実行するスレッド数
+TRAVERSAL_MAX_WORKERS = 16
+# バルククエリ1回に詰める親フォルダIDの数
+BULK_QUERY_PARENTS = 20
+# files.listの1ページあたり取得件数（Drive APIの最大値）
+LIST_PAGE_SIZE = 1000
+# スレッドごとのDriveサービス保持用
+_thread_local = threading.local()
+# get_thread_serviceがサービスを構築するための認証情報（main()で設定）
+_credentials = None
+
+def get_thread_service(default_service):
+    """ワーカースレッド専用のDrive APIサービスを取得
+
+    googleapiclientのserviceオブジェクトはスレッドセーフではないため、
+    スレッドごとに別のserviceを構築する。認証情報が未設定の場合は
+    渡されたserviceをそのまま使う。
+    """
+    if _credentials is None:
+        return default_service
+    service = getattr(_thread_local, 'service', None)
+    if service is None:
+        service = build('drive', 'v3', credentials=_credentials, cache_discovery=False)
+        _thread_local.service = service
+    return service
+
 def retry_on_api_error(func, max_retries: int = 20, base_delay: float = 1.0):
     """APIエラー時のリトライ機能"""
     for attempt in range(max_retries + 1):
@@ -107,6 +136,7 @@ def list_drive_files(service, folder_id: str) -> List[Dict]:
                 fields='nextPageToken, files(id, name, mimeType)',
                 includeItemsFromAllDrives=True,
                 supportsAllDrives=True,
+                pageSize=LIST_PAGE_SIZE,
                 pageToken=page_token
             ).execute()
             return response
@@ -150,9 +180,10 @@ def read_spreadsheet(sheets_service, spreadsheet_id: str, sheet_id: int) -> List
         List[Dict]: [{'row': 2, 'prefecture': '東京都', 'city': '渋谷区'}, ...]
     """
     def api_call():
-        # シートIDからシート名を取得
+        # シートIDからシート名を取得（必要なプロパティのみ取得する）
         spreadsheet = sheets_service.spreadsheets().get(
-            spreadsheetId=spreadsheet_id
+            spreadsheetId=spreadsheet_id,
+            fields='sheets(properties(sheetId,title))'
         ).execute()
 
         sheet_name = None
@@ -196,10 +227,67 @@ def read_spreadsheet(sheets_service, spreadsheet_id: str, sheet_id: int) -> List
         logger.error(f"スプレッドシート読み込みエラー: {error}")
         raise
 
+def list_folders_bulk(service, parent_ids: List[str]) -> Dict[str, List[Dict]]:
+    """複数の親フォルダ直下のサブフォルダをまとめて取得
+
+    親IDを20件ずつ「'id' in parents」のORで連結した1つのクエリに
+    まとめることで、フォルダ数ぶんの往復を階層あたり数回に減らす。
+    チャンクごとのクエリはワーカースレッドで並列実行する。
+
+    Returns:
+        Dict[親フォルダID, サブフォルダのitemリスト]
+    """
+    children: Dict[str, List[Dict]] = {parent_id: [] for parent_id in parent_ids}
+    children_lock = threading.Lock()
+
+    def fetch_chunk(chunk):
+        service_local = get_thread_service(service)
+        parents_clause = ' or '.join(f"'{parent_id}' in parents" for parent_id in chunk)
+        query = (f"({parents_clause}) and trashed=false "
+                 f"and mimeType='application/vnd.google-apps.folder'")
+        page_token = None
+
+        while True:
+            def api_call():
+                response = service_local.files().list(
+                    q=query,
+                    spaces='drive',
+                    fields='nextPageToken, files(id, name, parents)',
+                    includeItemsFromAllDrives=True,
+                    supportsAllDrives=True,
+                    pageSize=LIST_PAGE_SIZE,
+                    pageToken=page_token
+                ).execute()
+                return response
+
+            response = retry_on_api_error(api_call)
+            with children_lock:
+                for item in response.get('files', []):
+                    for parent_id in item.get('parents', []):
+                        if parent_id in children:
+                            children[parent_id].append(item)
+            page_token = response.get('nextPageToken', None)
+            if not page_token:
+                break
+
+    chunks = [parent_ids[start:start + BULK_QUERY_PARENTS]
+              for start in range(0, len(parent_ids), BULK_QUERY_PARENTS)]
+    if not chunks:
+        return children
+    with ThreadPoolExecutor(max_workers=min(TRAVERSAL_MAX_WORKERS, len(chunks))) as executor:
+        futures = [executor.submit(fetch_chunk, chunk) for chunk in chunks]
+        for future in as_completed(futures):
+            future.result()
+    return children
+
 def build_folder_map(drive_service, base_folder_id: str) -> Dict[Tuple[str, str], str]:
     """
     基準フォルダ内のフォルダ構造を探索してマップを作成
 
+    フォルダを1つずつ一覧する代わりに、階層ごとに親IDをまとめた
+    バルククエリで一括取得する。往復回数はフォルダ数ではなく
+    階層数×チャンク数に比例する。
+
     Returns:
         Dict[Tuple[prefecture, city], folder_id]
     """
@@ -212,6 +300,19 @@ def build_folder_map(drive_service, base_folder_id: str) -> Dict[Tuple[str, str]
     total_first_level = len(first_level_folders)
     logger.info(f"第1階層フォルダ数: {total_first_level}")
 
+    # 第2階層を一括取得
+    second_by_parent = list_folders_bulk(drive_service, [item['id'] for item in first_level_folders])
+
+    # 第3階層が必要な親（立候補者なし配下の都道府県、都道府県配下の立候補者なし）を集める
+    third_parent_ids = []
+    for first_item in first_level_folders:
+        first_name = first_item['name'].strip()
+        for second_item in second_by_parent[first_item['id']]:
+            if first_name == "立候補者なし" or second_item['name'].strip() == "立候補者なし":
+                third_parent_ids.append(second_item['id'])
+    third_by_parent = list_folders_bulk(drive_service, third_parent_ids)
+
+    # 取得済みの階層からマップを組み立てる
     for first_idx, first_item in enumerate(first_level_folders, 1):
         first_name = first_item['name'].strip()
         first_id = first_item['id']
@@ -220,59 +321,95 @@ def build_folder_map(drive_service, base_folder_id: str) -> Dict[Tuple[str, str]
             # 立候補者なし/{prefecture}/{city}
             logger.info(f"[{first_idx}/{total_first_level}] 立候補者なしフォルダ: {first_name}")
 
-            prefecture_items = list_drive_files(drive_service, first_id)
-            prefecture_folders = [item for item in prefecture_items if item['mimeType'] == 'application/vnd.google-apps.folder']
-
-            for prefecture_item in prefecture_folders:
+            for prefecture_item in second_by_parent[first_id]:
                 prefecture_name = prefecture_item['name'].strip()
-                prefecture_id = prefecture_item['id']
-
-                city_items = list_drive_files(drive_service, prefecture_id)
-                city_folders = [item for item in city_items if item['mimeType'] == 'application/vnd.google-apps.folder']
 
-                for city_item in city_folders:
+                for city_item in third_by_parent.get(prefecture_item['id'], []):
                     city_name = city_item['name'].strip()
-                    city_id = city_item['id']
-                    key = (prefecture_name, city_name)
-                    folder_map[key] = city_id
-                    logger.info(f"  登録: {prefecture_name}/{city_name} -> {city_id}")
+                    folder_map[(prefecture_name, city_name)] = city_item['id']
+                    logger.info(f"  登録: {prefecture_name}/{city_name} -> {city_item['id']}")
 
         else:
             # {prefecture}/{city} または {prefecture}/立候補者なし/{city}
             prefecture_name = first_name
-            prefecture_id = first_id
 
             logger.info(f"[{first_idx}/{total_first_level}] 都道府県フォルダ: {prefecture_name}")
 
-            second_level_items = list_drive_files(drive_service, prefecture_id)
-            second_level_folders = [item for item in second_level_items if item['mimeType'] == 'application/vnd.google-apps.folder']
-
-            for second_item in second_level_folders:
+            for second_item in second_by_parent[first_id]:
                 second_name = second_item['name'].strip()
-                second_id = second_item['id']
 
                 if second_name == "立候補者なし":
                     # {prefecture}/立候補者なし/{city}
-                    city_items = list_drive_files(drive_service, second_id)
-                    city_folders = [item for item in city_items if item['mimeType'] == 'application/vnd.google-apps.folder']
-
-                    for city_item in city_folders:
+                    for city_item in third_by_parent.get(second_item['id'], []):
                         city_name = city_item['name'].strip()
-                        city_id = city_item['id']
-                        key = (prefecture_name, city_name)
-                        folder_map[key] = city_id
-                        logger.info(f"  登録: {prefecture_name}/立候補者なし/{city_name} -> {city_id}")
+                        folder_map[(prefecture_name, city_name)] = city_item['id']
+                        logger.info(f"  登録: {prefecture_name}/立候補者なし/{city_name} -> {city_item['id']}")
                 else:
                     # {prefecture}/{city}
-                    city_name = second_name
-                    city_id = second_id
-                    key = (prefecture_name, city_name)
-                    folder_map[key] = city_id
-                    logger.info(f"  登録: {prefecture_name}/{city_name} -> {city_id}")
+                    folder_map[(prefecture_name, second_name)] = second_item['id']
+                    logger.info(f"  登録: {prefecture_name}/{second_name} -> {second_item['id']}")
 
     logger.info(f"フォルダマップ作成完了: {len(folder_map)}件")
     return folder_map
 
+def load_folder_map_cache(cache_path: str, base_folder_id: str,
+                          ttl_hours: float) -> Optional[Dict[Tuple[str, str], str]]:
+    """キャッシュファイルからフォルダマップを読み込む
+
+    キャッシュが無い、基準フォルダIDのエントリが無い、または
+    有効期限切れの場合はNoneを返す。
+    """
+    try:
+        with open(cache_path, encoding='utf-8') as f:
+            cache = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+    entry = cache.get(base_folder_id)
+    if not entry:
+        return None
+    if time.time() - entry.get('timestamp', 0) > ttl_hours * 3600:
+        logger.info("フォルダマップキャッシュの有効期限が切れています")
+        return None
+
+    folder_map = {}
+    for key, folder_id in entry.get('map', {}).items():
+        prefecture, _, city = key.partition('|')
+        folder_map[(prefecture, city)] = folder_id
+
+    logger.info(f"フォルダマップをキャッシュから読み込み: {len(folder_map)}件 ({cache_path})")
+    return folder_map
+
+def save_folder_map_cache(cache_path: str, base_folder_id: str,
+                          folder_map: Dict[Tuple[str, str], str]):
+    """フォルダマップをキャッシュファイルへ書き込む
+
+    他の基準フォルダIDのエントリは保持し、一時ファイル経由の
+    os.replaceで原子的に置き換える。
+    """
+    try:
+        with open(cache_path, encoding='utf-8') as f:
+            cache = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        cache = {}
+
+    cache[base_folder_id] = {
+        'timestamp': time.time(),
+        'map': {f"{prefecture}|{city}": folder_id
+                for (prefecture, city), folder_id in folder_map.items()}
+    }
+
+    fd, tmp_path = tempfile.mkstemp(
+        dir=os.path.dirname(cache_path) or '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(cache, f, ensure_ascii=False)
+        os.replace(tmp_path, cache_path)
+    except Exception as error:
+        logger.warning(f"フォルダマップキャッシュの書き込みに失敗: {error}")
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+
 def write_to_spreadsheet(sheets_service, spreadsheet_id: str, sheet_name: str, column: str, updates: List[Tuple[int, str]]):
     """
     スプレッドシートに書き込み
@@ -284,14 +421,22 @@ def write_to_spreadsheet(sheets_service, spreadsheet_id: str, sheet_name: str, c
         logger.info("書き込むデータがありません")
         return
 
-    # A1記法でのセル範囲を準備
+    # 連続する行は1つのレンジの2次元配列にまとめて書き込む
+    # （1セルずつN個のレンジを送るとサーバ側でN回の範囲更新になる。
+    #   行が飛んでいる箇所は既存セルを消さないようレンジを分ける）
+    updates = sorted(updates)
     data = []
-    for row, value in updates:
-        range_name = f"'{sheet_name}'!{column}{row}"
-        data.append({
-            'range': range_name,
-            'values': [[value]]
-        })
+    run_start = 0
+    for i in range(1, len(updates) + 1):
+        if i == len(updates) or updates[i][0] != updates[i - 1][0] + 1:
+            run = updates[run_start:i]
+            first_row = run[0][0]
+            last_row = run[-1][0]
+            data.append({
+                'range': f"'{sheet_name}'!{column}{first_row}:{column}{last_row}",
+                'values': [[value] for _, value in run]
+            })
+            run_start = i
 
     def api_call():
         body = {
@@ -318,6 +463,14 @@ def main():
     parser.add_argument('spreadsheet_id', help='スプレッドシートID')
     parser.add_argument('sheet_id', type=int, help='シートID（数値）')
     parser.add_argument('column', help='書き込み先の列（例: C）')
+    parser.add_argument('--cache-path', type=str, default='.folder_map_cache.json',
+                        help='フォルダマップキャッシュのファイルパス')
+    parser.add_argument('--cache-ttl-hours', type=float, default=24.0,
+                        help='キャッシュの有効時間（時間）')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='キャッシュを読み書きせず毎回探索する')
+    parser.add_argument('--refresh-cache', action='store_true',
+                        help='キャッシュを無視して再探索し、結果でキャッシュを更新する')
 
     args = parser.parse_args()
 
@@ -333,6 +486,9 @@ def main():
         creds = get_credentials()
 
         # Google Drive APIサービスを作成
+        # （ワーカースレッドが自分用のserviceを構築できるよう認証情報も保持）
+        global _credentials
+        _credentials = creds
         drive_service = build('drive', 'v3', credentials=creds)
 
         # Google Sheets APIサービスを作成
@@ -342,9 +498,16 @@ def main():
         logger.info("スプレッドシートを読み込み中...")
         sheet_data, sheet_name = read_spreadsheet(sheets_service, args.spreadsheet_id, args.sheet_id)
 
-        # フォルダマップを作成
-        logger.info("フォルダ構造を探索中...")
-        folder_map = build_folder_map(drive_service, args.base_folder_id)
+        # フォルダマップを作成（キャッシュがあれば再探索を省く）
+        folder_map = None
+        if not args.no_cache and not args.refresh_cache:
+            folder_map = load_folder_map_cache(
+                args.cache_path, args.base_folder_id, args.cache_ttl_hours)
+        if folder_map is None:
+            logger.info("フォルダ構造を探索中...")
+            folder_map = build_folder_map(drive_service, args.base_folder_id)
+            if not args.no_cache:
+                save_folder_map_cache(args.cache_path, args.base_folder_id, folder_map)
 
         # マッチング処理
         logger.info("マッチング処理開始...")
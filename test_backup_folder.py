@@ -91,10 +91,12 @@ class TestCheckpointManager(unittest.TestCase):
     
     def tearDown(self):
         """テスト後のクリーンアップ"""
-        # テスト用チェックポイントファイルを削除
+        # テスト用チェックポイントファイル・ログを削除
         try:
-            if os.path.exists(self.checkpoint_file):
-                os.remove(self.checkpoint_file)
+            self.checkpoint_manager.flush()
+            for path in (self.checkpoint_file, self.checkpoint_manager.log_file):
+                if os.path.exists(path):
+                    os.remove(path)
         except:
             pass
     
@@ -127,8 +129,9 @@ class TestCheckpointManager(unittest.TestCase):
         """チェックポイントの保存と読み込みテスト"""
         from backup_folder import CheckpointManager
         
-        # テストデータを設定
-        self.checkpoint_manager.processed_folders = {"フォルダ1", "フォルダ2"}
+        # テストデータを設定（処理済みフォルダは追記ログ経由で記録される）
+        self.checkpoint_manager.add_processed_folder("フォルダ1")
+        self.checkpoint_manager.add_processed_folder("フォルダ2")
         self.checkpoint_manager.backup_folder_id = "test_backup_id"
         self.checkpoint_manager.source_folder_id = "test_source_id"
         self.checkpoint_manager.target_folder_id = "test_target_id"
@@ -223,6 +226,7 @@ class TestBackupFolder(unittest.TestCase):
         
         # モジュールをインポート（モック後に）
         from backup_folder import load_secrets
+        load_secrets.cache_clear()
         result = load_secrets()
         self.assertEqual(result["installed"]["client_id"], "test_id")
     
@@ -230,6 +234,7 @@ class TestBackupFolder(unittest.TestCase):
     def test_load_secrets_file_not_found(self, mock_open):
         """load_secrets関数のファイル未発見テスト"""
         from backup_folder import load_secrets
+        load_secrets.cache_clear()
         with self.assertRaises(SystemExit):
             load_secrets()
     
@@ -242,6 +247,7 @@ class TestBackupFolder(unittest.TestCase):
         })
         
         from backup_folder import load_settings
+        load_settings.cache_clear()
         result = load_settings()
         self.assertEqual(result["BASE_FOLDER_ID"], "test_id")
     
@@ -308,10 +314,10 @@ class TestBackupFolder(unittest.TestCase):
         self.assertEqual(len(shortcut_ids), 0)
     
     @patch('backup_folder.logger')
-    def test_count_total_items_recursive(self, mock_logger):
-        """count_total_items_recursive関数のテスト"""
-        from backup_folder import count_total_items_recursive
-        
+    def test_scan(self, mock_logger):
+        """scan関数のテスト"""
+        from backup_folder import scan
+
         mock_service = Mock()
         mock_files_list = Mock()
         mock_service.files.return_value = mock_files_list
@@ -332,16 +338,18 @@ class TestBackupFolder(unittest.TestCase):
             {'files': sub_files, 'nextPageToken': None}
         ]
         
-        result = count_total_items_recursive(mock_service, 'test_folder_id')
-        
+        result = scan(mock_service, 'test_folder_id')
+
         # ルートフォルダ: 2アイテム + サブフォルダ内: 1アイテム = 3アイテム
-        self.assertEqual(result, 3)
-    
+        self.assertEqual(result.total_items, 3)
+        self.assertEqual(result.folders, 1)
+        self.assertEqual(result.files, 2)
+
     @patch('backup_folder.logger')
-    def test_count_total_items_recursive_with_shortcuts(self, mock_logger):
-        """count_total_items_recursive関数のショートカット含むテスト"""
-        from backup_folder import count_total_items_recursive
-        
+    def test_scan_with_shortcuts(self, mock_logger):
+        """scan関数のショートカット含むテスト"""
+        from backup_folder import scan
+
         mock_service = Mock()
         
         # テスト用のファイルデータ（ショートカット含む）
@@ -355,7 +363,7 @@ class TestBackupFolder(unittest.TestCase):
             {'id': 'shortcut2', 'name': 'shortcut_to_folder', 'mimeType': 'application/vnd.google-apps.shortcut'}
         ]
         
-        def list_drive_files_side_effect(service, folder_id, skip_shortcuts):
+        def list_drive_files_side_effect(service, folder_id, skip_shortcuts, fields_extra=None):
             if folder_id == 'test_folder_id':
                 return [f for f in root_files if not (skip_shortcuts and f['mimeType'] == 'application/vnd.google-apps.shortcut')]
             elif folder_id == 'folder1':
@@ -365,13 +373,15 @@ class TestBackupFolder(unittest.TestCase):
         
         with patch('backup_folder.list_drive_files', side_effect=list_drive_files_side_effect):
             # ショートカットをスキップしない場合
-            result = count_total_items_recursive(mock_service, 'test_folder_id', skip_shortcuts=False)
+            result = scan(mock_service, 'test_folder_id', skip_shortcuts=False)
             # ルートフォルダ: 3アイテム + サブフォルダ内: 2アイテム = 5アイテム
-            self.assertEqual(result, 5)
+            self.assertEqual(result.total_items, 5)
+            self.assertEqual(result.shortcuts, 2)
             # ショートカットをスキップする場合
-            result = count_total_items_recursive(mock_service, 'test_folder_id', skip_shortcuts=True)
+            result = scan(mock_service, 'test_folder_id', skip_shortcuts=True)
             # ルートフォルダ: 2アイテム + サブフォルダ内: 1アイテム = 3アイテム
-            self.assertEqual(result, 3)
+            self.assertEqual(result.total_items, 3)
+            self.assertEqual(result.shortcuts, 0)
     
     @patch('backup_folder.logger')
     def test_copy_file(self, mock_logger):
@@ -382,17 +392,16 @@ class TestBackupFolder(unittest.TestCase):
         mock_files = Mock()
         mock_service.files.return_value = mock_files
         
-        # ファイルメタデータのモック
-        file_metadata = {'name': 'test.txt', 'mimeType': 'text/plain'}
-        copied_file = {'id': 'new_file_id', 'name': 'test.txt'}
-        
-        mock_files.get.return_value.execute.return_value = file_metadata
+        # コピー結果のモック
+        copied_file = {'id': 'new_file_id'}
         mock_files.copy.return_value.execute.return_value = copied_file
-        
-        result = copy_file(mock_service, 'old_file_id', 'new_parent_id')
-        
+
+        result = copy_file(mock_service, 'old_file_id', 'new_parent_id', 'test.txt')
+
         self.assertEqual(result, 'new_file_id')
         mock_files.copy.assert_called_once()
+        # 名前は一覧取得済みのものを使うため、事前のfiles.getは発生しない
+        mock_files.get.assert_not_called()
     
     @patch('backup_folder.logger')
     def test_copy_folder_recursive(self, mock_logger):
@@ -412,14 +421,20 @@ class TestBackupFolder(unittest.TestCase):
             {'id': 'file1', 'name': 'test.txt', 'mimeType': 'text/plain'},
             {'id': 'subfolder', 'name': 'sub', 'mimeType': 'application/vnd.google-apps.folder'}
         ]
-        
-        with patch('backup_folder.list_drive_files', return_value=items):
-            with patch('backup_folder.copy_file', return_value='new_file_id'):
-                with patch('backup_folder.copy_folder_recursive', return_value='new_subfolder_id'):
+
+        def list_side_effect(service, folder_id, skip_shortcuts=False, fields_extra=None):
+            return items if folder_id == 'source_id' else []
+
+        with patch('backup_folder.list_drive_files', side_effect=list_side_effect):
+            with patch('backup_folder.copy_files_batch', return_value=['new_file_id']) as mock_batch:
+                with patch('backup_folder.checkpoint_manager') as mock_cp:
+                    mock_cp.is_processed.return_value = False
                     result = copy_folder_recursive(mock_service, 'source_id', 'target_id', 'test_folder', skip_shortcuts=False)
-        
+
         self.assertEqual(result, 'new_folder_id')
-        mock_files.create.assert_called_once()
+        # ルートフォルダとサブフォルダの2回作成される
+        self.assertEqual(mock_files.create.call_count, 2)
+        mock_batch.assert_called_once()
     
     @patch('backup_folder.logger')
     def test_get_folder_name(self, mock_logger):
@@ -563,9 +578,9 @@ class TestBackupFolderIntegration(unittest.TestCase):
     @patch('backup_folder.validate_folder_id')
     @patch('backup_folder.get_folder_name')
     @patch('backup_folder.list_drive_files')
-    @patch('backup_folder.count_total_items_recursive')
+    @patch('backup_folder.scan')
     @patch('backup_folder.copy_folder_recursive')
-    def test_main_dry_run(self, mock_copy, mock_count, mock_list, mock_get_name, mock_validate, 
+    def test_main_dry_run(self, mock_copy, mock_scan, mock_list, mock_get_name, mock_validate,
                          mock_load_settings, mock_get_creds, mock_build):
         """ドライラン機能のテスト"""
         # モックの設定
@@ -578,7 +593,8 @@ class TestBackupFolderIntegration(unittest.TestCase):
             {'name': 'test.txt', 'mimeType': 'text/plain'},
             {'name': 'subfolder', 'mimeType': 'application/vnd.google-apps.folder'}
         ]
-        mock_count.return_value = 5
+        from backup_folder import ScanResult
+        mock_scan.return_value = ScanResult(total_items=5, folders=1, files=4)
         
         # コマンドライン引数をモック
         with patch('sys.argv', ['backup_folder.py', '--dry-run', 'test_target_id']):
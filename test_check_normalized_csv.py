@@ -43,25 +43,25 @@ class TestDetectEncoding(unittest.TestCase):
     
     @patch('check_normalized_csv.chardet.detect')
     def test_detect_utf8(self, mock_detect):
-        """UTF-8エンコーディングの検出テスト"""
-        mock_detect.return_value = {'encoding': 'utf-8', 'confidence': 0.99}
-        content = b"test content"
+        """UTF-8エンコーディングの検出テスト（chardetを通らない早道）"""
+        content = "テスト内容".encode('utf-8')
         result = check_normalized_csv.detect_encoding(content)
         self.assertEqual(result, 'utf-8')
-    
+        mock_detect.assert_not_called()
+
     @patch('check_normalized_csv.chardet.detect')
     def test_detect_shift_jis(self, mock_detect):
         """Shift_JISエンコーディングの検出テスト"""
         mock_detect.return_value = {'encoding': 'shift_jis', 'confidence': 0.95}
-        content = b"test content"
+        content = "テスト内容".encode('cp932')
         result = check_normalized_csv.detect_encoding(content)
         self.assertEqual(result, 'shift_jis')
-    
+
     @patch('check_normalized_csv.chardet.detect')
     def test_detect_none(self, mock_detect):
         """エンコーディング検出失敗のテスト"""
         mock_detect.return_value = None
-        content = b"test content"
+        content = "テスト内容".encode('cp932')
         result = check_normalized_csv.detect_encoding(content)
         self.assertIsNone(result)
 
@@ -632,6 +632,9 @@ class TestFilterRows(unittest.TestCase):
     
     def setUp(self):
         """テストデータの準備"""
+        # ジオコーディングキャッシュをテスト間で共有しない
+        check_normalized_csv.cached_geocode.cache_clear()
+        check_normalized_csv._geocode_cache = {}
         self.rows = [
             ["東京都", "千代田区", "全部あり", "folder1"],
             ["東京都", "中央区", "全部あり", "folder2"],
@@ -821,6 +824,9 @@ class TestFixAndUploadCsv(unittest.TestCase):
     
     def setUp(self):
         """テスト前の準備"""
+        # ジオコーディングキャッシュをテスト間で共有しない
+        check_normalized_csv.cached_geocode.cache_clear()
+        check_normalized_csv._geocode_cache = {}
         self.mock_service = MagicMock()
         self.file_id = "test_file_id"
         self.decoded = "prefecture,city,number,address,name,lat,long\n東京都,渋谷区,1,テスト住所,テスト名前,35.6580,139.7016"
@@ -1022,11 +1028,11 @@ class TestAppendCsvFileProcessing(unittest.TestCase):
         self.assertEqual(call_args[0][0][1], 'test_city_normalized.csv')  # 基本ファイル
         self.assertEqual(call_args[1][0][1], 'test_city_normalized_20250708append.csv')  # appendファイル 
 
-    @patch('check_normalized_csv.list_drive_files')
-    def test_should_skip_by_time_file_not_found_logs_filename(self, mock_list_files):
+    @patch('check_normalized_csv.get_file_by_name')
+    def test_should_skip_by_time_file_not_found_logs_filename(self, mock_get_file):
         """should_skip_by_timeでファイルが見つからない場合にファイル名がログに含まれることをテスト"""
         # ファイルが存在しない状況をシミュレート
-        mock_list_files.return_value = []
+        mock_get_file.return_value = None
         
         with patch('check_normalized_csv.logger') as mock_logger:
             result = check_normalized_csv.should_skip_by_time(
@@ -1095,6 +1101,36 @@ class TestDeletionFunctionality(unittest.TestCase):
         self.assertFalse(result)
         mock_logger.error.assert_called_once()
 
+    def test_delete_drive_files_batch(self):
+        """バッチ削除で成功件数だけが数えられるテスト"""
+        targets = [
+            {'id': 'file1', 'name': '削除希望_old.csv'},
+            {'id': 'file2', 'name': '削除希望_new.csv'},
+        ]
+
+        class FakeBatch:
+            """addされたサブリクエストをexecute時にコールバックへ流す疑似バッチ"""
+            def __init__(self, callback):
+                self.callback = callback
+                self.request_ids = []
+
+            def add(self, request, request_id=None):
+                self.request_ids.append(request_id)
+
+            def execute(self):
+                for rid in self.request_ids:
+                    # 2件目だけ失敗させる
+                    exc = Exception("削除エラー") if rid == '1' else None
+                    self.callback(rid, None, exc)
+
+        service = Mock()
+        service.new_batch_http_request.side_effect = lambda callback: FakeBatch(callback)
+
+        with patch('check_normalized_csv.logger'):
+            result = check_normalized_csv.delete_drive_files_batch(service, targets)
+
+        self.assertEqual(result, 1)
+
     def test_process_single_target_with_deletion_targets_check_mode(self):
         """チェックモードでの削除希望ファイル検出テスト"""
         mock_files = [
@@ -1127,7 +1163,7 @@ class TestDeletionFunctionality(unittest.TestCase):
         ]
         
         with patch('check_normalized_csv.find_deletion_targets', return_value=[mock_files[1]]):
-            with patch('check_normalized_csv.delete_drive_file', return_value=True) as mock_delete:
+            with patch('check_normalized_csv.delete_drive_files_batch', return_value=1) as mock_delete:
                 with patch('check_normalized_csv.list_drive_files', return_value=mock_files):
                     with patch('check_normalized_csv.find_csv_files', return_value=[]):
                         with patch('check_normalized_csv.logger') as mock_logger:
@@ -1141,7 +1177,7 @@ class TestDeletionFunctionality(unittest.TestCase):
                                                 self.mock_drive_service, opts, counters)
         
         mock_logger.info.assert_called_with("[1行目] 東京都渋谷区: 削除希望ファイル 1件を削除します")
-        mock_delete.assert_called_once_with(self.mock_drive_service, 'file2', '削除希望_old.csv')
+        mock_delete.assert_called_once_with(self.mock_drive_service, [mock_files[1]])
         self.assertEqual(counters['deletion_target_count'], 1)
         self.assertEqual(counters['deletion_success_count'], 1)
 
@@ -1153,14 +1189,9 @@ class TestDeletionFunctionality(unittest.TestCase):
             {'id': 'file3', 'name': '削除希望_new.csv'},
         ]
         
-        def mock_delete_side_effect(service, file_id, file_name):
-            if file_name == '削除希望_old.csv':
-                return True
-            else:
-                return False
-        
         with patch('check_normalized_csv.find_deletion_targets', return_value=[mock_files[1], mock_files[2]]):
-            with patch('check_normalized_csv.delete_drive_file', side_effect=mock_delete_side_effect) as mock_delete:
+            # 2件中1件だけ削除に成功したケース
+            with patch('check_normalized_csv.delete_drive_files_batch', return_value=1) as mock_delete:
                 with patch('check_normalized_csv.list_drive_files', return_value=mock_files):
                     with patch('check_normalized_csv.find_csv_files', return_value=[]):
                         with patch('check_normalized_csv.logger') as mock_logger:
@@ -1174,7 +1205,7 @@ class TestDeletionFunctionality(unittest.TestCase):
                                                 self.mock_drive_service, opts, counters)
         
         mock_logger.info.assert_called_with("[1行目] 東京都渋谷区: 削除希望ファイル 2件を削除します")
-        self.assertEqual(mock_delete.call_count, 2)
+        mock_delete.assert_called_once_with(self.mock_drive_service, [mock_files[1], mock_files[2]])
         self.assertEqual(counters['deletion_target_count'], 2)
         self.assertEqual(counters['deletion_success_count'], 1)  # 1件成功、1件失敗
 
@@ -5,6 +5,7 @@ import os
 
 # テスト対象のモジュールをインポート
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import check_normalized_csv
 from check_normalized_csv import format_size, calculate_folder_size, process_size_calculation
 
 class TestSizeCalculation(unittest.TestCase):
@@ -86,6 +87,7 @@ class TestSizeCalculation(unittest.TestCase):
             fields='nextPageToken, files(id, name, mimeType, size)',
             includeItemsFromAllDrives=True,
             supportsAllDrives=True,
+            pageSize=check_normalized_csv.DRIVE_LIST_PAGE_SIZE,
             pageToken=None
         )
 